@@ -1,25 +1,125 @@
+import asyncio
+import math
 import time
+from array import array
+from contextvars import ContextVar
+from collections import OrderedDict, defaultdict
 from datetime import datetime
-from typing import Optional, List
+from typing import Optional, List, Dict, Tuple
 from fastapi import HTTPException, Security, Depends
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from slowapi import Limiter, _rate_limit_exceeded_handler
-from slowapi.util import get_remote_address
-from slowapi.errors import RateLimitExceeded
 import structlog
 
-from app.database import get_api_key_by_value, update_api_key_usage
+try:
+    import redis.asyncio as aioredis
+except ImportError:  # Redis is optional; fall back to in-memory limits
+    aioredis = None
+
+from app.database import get_api_key_by_digest, hash_api_key, update_api_key_usage
 from app.models import ApiKeyResponse
 from app.config import settings
+from app.logger import auth_logger
 
 logger = structlog.get_logger()
 security = HTTPBearer()
 
-# Rate limiter
-limiter = Limiter(key_func=get_remote_address)
+# Rate limit window in seconds
+RATE_LIMIT_WINDOW = 60
+
+# Monotonic timestamp captured once per request by RateLimitMiddleware
+REQUEST_NOW: ContextVar[float] = ContextVar("request_now")
+
+
+def request_now() -> float:
+    """Monotonic time of the current request (or now, outside a request)"""
+    return REQUEST_NOW.get(None) or time.monotonic()
+
+
+class GCRARateLimiter:
+    """In-memory GCRA rate limiter keeping one theoretical arrival time per key"""
+
+    __slots__ = ("window", "_tat")
+
+    def __init__(self, window: float):
+        self.window = window
+        # Unboxed doubles indexed by key id (ids are small, dense integers)
+        self._tat = array("d")
+
+    def check(self, key: int, limit: int, now: float) -> bool:
+        """Record a request for key and return False if it exceeds limit per window"""
+        tat_array = self._tat
+        if key >= len(tat_array):
+            tat_array.extend([0.0] * (key + 1 - len(tat_array)))
+
+        tat = tat_array[key]
+        if tat < now:
+            tat = now
+        new_tat = tat + self.window / limit
+
+        # Allow a burst of up to one full window worth of requests
+        if new_tat - now > self.window + 1e-9:
+            return False
+
+        tat_array[key] = new_tat
+        return True
+
+
+# GCRA in Lua so the read-modify-write is atomic on the Redis server.
+# Uses the server clock so all workers agree on "now".
+_REDIS_GCRA_SCRIPT = """
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+local window = tonumber(ARGV[1])
+local tat = tonumber(redis.call('GET', KEYS[1])) or now
+if tat < now then tat = now end
+local new_tat = tat + window / tonumber(ARGV[2])
+if new_tat - now > window + 1e-9 then return 0 end
+redis.call('SET', KEYS[1], string.format('%.6f', new_tat), 'PX', math.ceil((new_tat - now) * 1000))
+return 1
+"""
+
+
+class RedisRateLimiter:
+    """GCRA rate limiter shared across workers through Redis"""
+
+    def __init__(self, url: str, window: float):
+        self.window = window
+        self._client = aioredis.from_url(url)
+        self._script = self._client.register_script(_REDIS_GCRA_SCRIPT)
+
+    async def check(self, key: int, limit: int) -> Optional[bool]:
+        """Return whether the request is allowed, or None if Redis is unavailable"""
+        try:
+            allowed = await self._script(keys=[f"rl:{key}"], args=[self.window, limit])
+            return bool(allowed)
+        except Exception as e:
+            logger.warning("Redis rate limit check failed", key_id=key, error=str(e))
+            return None
+
+    async def close(self):
+        """Close the Redis connection pool"""
+        await self._client.aclose()
+
 
 # In-memory rate limiting for API keys
-api_key_rate_limits = {}
+api_key_rate_limiter = GCRARateLimiter(RATE_LIMIT_WINDOW)
+
+# Shared rate limiting when Redis is configured (in-memory is the fallback)
+redis_rate_limiter: Optional[RedisRateLimiter] = None
+if settings.REDIS_URL:
+    if aioredis is None:
+        logger.warning("REDIS_URL is set but redis is not installed, using in-memory rate limits")
+    else:
+        redis_rate_limiter = RedisRateLimiter(settings.REDIS_URL, RATE_LIMIT_WINDOW)
+
+# Validated API keys keyed by the digest of the secret (LRU, oldest first)
+_auth_cache: "OrderedDict[bytes, Tuple[ApiKeyResponse, float]]" = OrderedDict()
+_auth_cache_sweeper: Optional[asyncio.Task] = None
+
+# Pending API key usage, flushed to the database in batches
+_usage_counters: Dict[int, int] = defaultdict(int)
+_usage_last_seen: Dict[int, float] = {}
+_usage_flusher: Optional[asyncio.Task] = None
 
 
 class AuthenticationError(HTTPException):
@@ -32,6 +132,16 @@ class AuthorizationError(HTTPException):
         super().__init__(status_code=403, detail=detail)
 
 
+class RateLimitError(HTTPException):
+    def __init__(self, limit_per_minute: int):
+        super().__init__(
+            status_code=429,
+            detail=f"Rate limit exceeded. Maximum {limit_per_minute} requests per minute.",
+            # One request frees up every window / limit seconds
+            headers={"Retry-After": str(math.ceil(RATE_LIMIT_WINDOW / limit_per_minute))},
+        )
+
+
 async def get_api_key_from_credentials(
     credentials: HTTPAuthorizationCredentials = Security(security),
 ) -> ApiKeyResponse:
@@ -39,57 +149,157 @@ async def get_api_key_from_credentials(
     if not credentials or not credentials.credentials:
         raise AuthenticationError("API key required")
 
-    api_key = await get_api_key_by_value(credentials.credentials)
+    # Look keys up by keyed digest so the secret itself is never compared
+    api_key = await _get_cached_api_key(hash_api_key(credentials.credentials))
     if not api_key:
-        logger.warning(
-            "Invalid API key attempt", key_prefix=credentials.credentials[:8]
-        )
+        auth_logger.log_invalid_key(credentials.credentials[:8])
         raise AuthenticationError("Invalid API key")
 
     if not api_key.is_active:
-        logger.warning("Inactive API key used", key_id=api_key.id)
+        auth_logger.log_inactive_key(api_key.id)
         raise AuthenticationError("API key is disabled")
 
     if api_key.expires_at and datetime.now() > api_key.expires_at:
-        logger.warning(
-            "Expired API key used", key_id=api_key.id, expires_at=api_key.expires_at
-        )
+        auth_logger.log_expired_key(api_key.id, api_key.expires_at)
         raise AuthenticationError("API key has expired")
 
-    # Update usage tracking
-    await update_api_key_usage(credentials.credentials)
+    # Update usage tracking (coalesced, flushed periodically)
+    _usage_counters[api_key.id] += 1
+    _usage_last_seen[api_key.id] = time.time()
 
     return api_key
 
 
-async def check_api_key_rate_limit(api_key: ApiKeyResponse) -> bool:
-    """Check if API key is within rate limits"""
-    current_time = time.time()
-    window_start = current_time - 60  # 1 minute window
-
-    # Initialize if first request
-    if api_key.id not in api_key_rate_limits:
-        api_key_rate_limits[api_key.id] = []
-
-    # Clean old requests outside the window
-    api_key_rate_limits[api_key.id] = [
-        req_time
-        for req_time in api_key_rate_limits[api_key.id]
-        if req_time > window_start
+async def flush_api_key_usage():
+    """Write pending API key usage counters to the database"""
+    if not _usage_counters:
+        return
+
+    pending = [
+        (count, _usage_last_seen[key_id], key_id)
+        for key_id, count in _usage_counters.items()
     ]
+    _usage_counters.clear()
+    _usage_last_seen.clear()
 
-    # Check if under rate limit
-    if len(api_key_rate_limits[api_key.id]) >= api_key.rate_limit_per_minute:
-        logger.warning(
-            "Rate limit exceeded",
-            key_id=api_key.id,
-            current_requests=len(api_key_rate_limits[api_key.id]),
-            limit=api_key.rate_limit_per_minute,
-        )
-        return False
+    try:
+        await update_api_key_usage(pending)
+    except Exception as e:
+        logger.error("Failed to update API key usage", keys=len(pending), error=str(e))
+
+
+async def _usage_flusher_loop():
+    """Periodically flush coalesced API key usage"""
+    while True:
+        await asyncio.sleep(settings.USAGE_FLUSH_INTERVAL_SECONDS)
+        await flush_api_key_usage()
+
+
+def start_usage_flusher():
+    """Start the background API key usage flusher"""
+    global _usage_flusher
+    if _usage_flusher is None or _usage_flusher.done():
+        _usage_flusher = asyncio.create_task(_usage_flusher_loop())
+
+
+async def stop_usage_flusher():
+    """Stop the usage flusher and write any pending usage"""
+    global _usage_flusher
+    if _usage_flusher:
+        _usage_flusher.cancel()
+        try:
+            await _usage_flusher
+        except asyncio.CancelledError:
+            pass
+        _usage_flusher = None
+    await flush_api_key_usage()
+
+
+async def close_redis_rate_limiter():
+    """Close the Redis rate limiter connection if configured"""
+    if redis_rate_limiter:
+        await redis_rate_limiter.close()
 
-    # Add current request
-    api_key_rate_limits[api_key.id].append(current_time)
+
+async def _get_cached_api_key(key_digest: bytes) -> Optional[ApiKeyResponse]:
+    """Look up an API key, serving recent lookups from the in-memory cache"""
+    now = request_now()
+
+    entry = _auth_cache.get(key_digest)
+    if entry and now - entry[1] < settings.AUTH_CACHE_TTL_SECONDS:
+        _auth_cache.move_to_end(key_digest)
+        return entry[0]
+
+    api_key = await get_api_key_by_digest(key_digest)
+    if not api_key:
+        _auth_cache.pop(key_digest, None)
+        return None
+
+    _auth_cache[key_digest] = (api_key, now)
+    _auth_cache.move_to_end(key_digest)
+    while len(_auth_cache) > settings.AUTH_CACHE_MAX_ENTRIES:
+        _auth_cache.popitem(last=False)
+
+    return api_key
+
+
+async def get_cached_api_key(key_value: str) -> Optional[ApiKeyResponse]:
+    """Look up an API key by its value through the auth cache"""
+    return await _get_cached_api_key(hash_api_key(key_value))
+
+
+def clear_auth_cache():
+    """Drop all cached API keys (e.g. after keys are updated or deleted)"""
+    _auth_cache.clear()
+
+
+def sweep_auth_cache() -> int:
+    """Remove expired entries from the auth cache"""
+    cutoff = time.monotonic() - settings.AUTH_CACHE_TTL_SECONDS
+    expired = [key for key, (_, cached_at) in _auth_cache.items() if cached_at <= cutoff]
+    for key in expired:
+        del _auth_cache[key]
+    return len(expired)
+
+
+async def _auth_cache_sweeper_loop():
+    """Periodically evict expired auth cache entries"""
+    while True:
+        await asyncio.sleep(settings.AUTH_CACHE_TTL_SECONDS)
+        try:
+            removed = sweep_auth_cache()
+            if removed:
+                logger.debug("Auth cache swept", removed=removed)
+        except Exception as e:
+            logger.error("Auth cache sweep failed", error=str(e))
+
+
+def start_auth_cache_sweeper():
+    """Start the background auth cache sweeper"""
+    global _auth_cache_sweeper
+    if _auth_cache_sweeper is None or _auth_cache_sweeper.done():
+        _auth_cache_sweeper = asyncio.create_task(_auth_cache_sweeper_loop())
+
+
+async def stop_auth_cache_sweeper():
+    """Stop the background auth cache sweeper"""
+    global _auth_cache_sweeper
+    if _auth_cache_sweeper:
+        _auth_cache_sweeper.cancel()
+        try:
+            await _auth_cache_sweeper
+        except asyncio.CancelledError:
+            pass
+        _auth_cache_sweeper = None
+
+
+def check_api_key_rate_limit(api_key: ApiKeyResponse) -> bool:
+    """Check if API key is within rate limits"""
+    # No await between read and write, so the update is atomic on the event loop
+    limit = api_key.rate_limit_per_minute
+    if not api_key_rate_limiter.check(api_key.id, limit, request_now()):
+        auth_logger.log_rate_limited(api_key.id, limit)
+        return False
     return True
 
 
@@ -99,39 +309,38 @@ async def get_current_api_key(
     """Get current authenticated API key with rate limiting"""
     api_key = await get_api_key_from_credentials(credentials)
 
-    # Check rate limiting
-    if not await check_api_key_rate_limit(api_key):
-        raise HTTPException(
-            status_code=429,
-            detail=f"Rate limit exceeded. Maximum {api_key.rate_limit_per_minute} requests per minute.",
-        )
+    # Check rate limiting, preferring shared state in Redis when available
+    allowed = None
+    if redis_rate_limiter:
+        allowed = await redis_rate_limiter.check(api_key.id, api_key.rate_limit_per_minute)
+    if allowed is None:
+        allowed = check_api_key_rate_limit(api_key)
+
+    if not allowed:
+        raise RateLimitError(api_key.rate_limit_per_minute)
 
     return api_key
 
 
 def require_scopes(required_scopes: List[str]):
     """Dependency to require specific scopes"""
+    required = frozenset(required_scopes)
 
     async def check_scopes(api_key: ApiKeyResponse = Depends(get_current_api_key)):
-        user_scopes = api_key.scopes
+        user_scopes = api_key.scopes_set
 
         # Admin scope grants all access
         if "admin" in user_scopes:
             return api_key
 
         # Check if user has all required scopes
-        missing_scopes = [
-            scope for scope in required_scopes if scope not in user_scopes
-        ]
+        missing_scopes = required - user_scopes
         if missing_scopes:
-            logger.warning(
-                "Insufficient scopes",
-                key_id=api_key.id,
-                required=required_scopes,
-                missing=missing_scopes,
+            auth_logger.log_insufficient_scopes(
+                api_key.id, required_scopes, sorted(missing_scopes)
             )
             raise AuthorizationError(
-                f"Missing required scopes: {', '.join(missing_scopes)}"
+                f"Missing required scopes: {', '.join(sorted(missing_scopes))}"
             )
 
         return api_key
@@ -139,16 +348,14 @@ def require_scopes(required_scopes: List[str]):
     return check_scopes
 
 
-def require_admin():
+async def require_admin(
+    api_key: ApiKeyResponse = Depends(get_current_api_key),
+) -> ApiKeyResponse:
     """Dependency to require admin access"""
-
-    async def check_admin(api_key: ApiKeyResponse = Depends(get_current_api_key)):
-        if "admin" not in api_key.scopes:
-            logger.warning("Admin access denied", key_id=api_key.id)
-            raise AuthorizationError("Admin access required")
-        return api_key
-
-    return check_admin
+    if "admin" not in api_key.scopes_set:
+        auth_logger.log_admin_denied(api_key.id)
+        raise AuthorizationError("Admin access required")
+    return api_key
 
 
 # Convenience dependencies
@@ -160,75 +367,45 @@ require_dashboard = require_scopes(["dashboard"])
 class RateLimitMiddleware:
     """Custom rate limiting middleware"""
 
-    def __init__(self, app):
+    def __init__(self, app, bypass_paths: Tuple[str, ...] = ()):
         self.app = app
-        self.global_requests = []
+        # Path prefixes exempt from the global limit (probes, static files)
+        self.bypass_paths = tuple(bypass_paths)
+        # Global token bucket, refilled continuously at the per-minute rate
+        self.capacity = float(settings.GLOBAL_RATE_LIMIT_PER_MINUTE)
+        self.refill_rate = self.capacity / RATE_LIMIT_WINDOW
+        self.tokens = self.capacity
+        self.last_refill = time.monotonic()
+
+        # The 429 response never changes, so build it once
+        body = b'{"detail":"Global rate limit exceeded"}'
+        retry_after = math.ceil(1 / self.refill_rate)
+        self._limited_start = {
+            "type": "http.response.start",
+            "status": 429,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+                (b"retry-after", str(retry_after).encode()),
+            ],
+        }
+        self._limited_body = {"type": "http.response.body", "body": body}
 
     async def __call__(self, scope, receive, send):
-        if scope["type"] == "http":
-            current_time = time.time()
-            window_start = current_time - 60  # 1 minute window
-
-            # Clean old requests
-            self.global_requests = [
-                req_time for req_time in self.global_requests if req_time > window_start
-            ]
+        if scope["type"] == "http" and not scope["path"].startswith(self.bypass_paths):
+            now = time.monotonic()
+            REQUEST_NOW.set(now)
+            self.tokens = min(
+                self.capacity, self.tokens + (now - self.last_refill) * self.refill_rate
+            )
+            self.last_refill = now
 
             # Check global rate limit
-            if len(self.global_requests) >= settings.GLOBAL_RATE_LIMIT_PER_MINUTE:
-                response = {
-                    "type": "http.response.start",
-                    "status": 429,
-                    "headers": [[b"content-type", b"application/json"]],
-                }
-                await send(response)
-
-                body = {
-                    "type": "http.response.body",
-                    "body": b'{"detail":"Global rate limit exceeded"}',
-                }
-                await send(body)
+            if self.tokens < 1:
+                await send(self._limited_start)
+                await send(self._limited_body)
                 return
 
-            # Add current request
-            self.global_requests.append(current_time)
+            self.tokens -= 1
 
         await self.app(scope, receive, send)
-
-
-def get_client_ip(request) -> str:
-    """Get client IP address from request"""
-    x_forwarded_for = request.headers.get("X-Forwarded-For")
-    if x_forwarded_for:
-        return x_forwarded_for.split(",")[0].strip()
-
-    x_real_ip = request.headers.get("X-Real-IP")
-    if x_real_ip:
-        return x_real_ip
-
-    return request.client.host if request.client else "unknown"
-
-
-async def validate_api_key_scopes(
-    api_key: ApiKeyResponse, required_scopes: List[str]
-) -> bool:
-    """Validate that API key has required scopes"""
-    if "admin" in api_key.scopes:
-        return True
-
-    return all(scope in api_key.scopes for scope in required_scopes)
-
-
-async def log_api_access(
-    api_key: ApiKeyResponse, endpoint: str, method: str, client_ip: str
-):
-    """Log API access for audit trail"""
-    logger.info(
-        "API access",
-        key_id=api_key.id,
-        key_name=api_key.name,
-        endpoint=endpoint,
-        method=method,
-        client_ip=client_ip,
-        scopes=api_key.scopes,
-    )
@@ -1,16 +1,101 @@
 import asyncio
-import schedule
+import aiosqlite
 import time
-from datetime import datetime, timedelta
-from typing import Dict, Any
+from contextlib import asynccontextmanager
+from datetime import date, datetime, timedelta
+from typing import Dict, Any, List, Optional, Set
 import structlog
 
 from app.config import settings
+from app.database import get_connection, optimize_database, rollup_cutoff, rollup_execution_stats
 from app.video_service import video_service
 from app.logger import system_logger
 
 logger = structlog.get_logger()
 
+# Rows deleted per transaction when purging old executions and rate limits
+DELETE_BATCH_SIZE = 5000
+
+# Pause between delete batches so API writers can take the lock
+DELETE_BATCH_PAUSE_SECONDS = 0.05
+
+# Only rewrite the database file when this fraction of its pages is free
+VACUUM_FREELIST_THRESHOLD = 0.15
+
+# PRAGMA auto_vacuum value for incremental mode, and free pages reclaimed per run
+AUTO_VACUUM_INCREMENTAL = 2
+INCREMENTAL_VACUUM_PAGES = 1000
+
+# Days back a forced cleanup checks for missing daily_stats rows
+DAILY_STATS_BACKFILL_DAYS = 30
+
+# Scheduling intervals in seconds
+VIDEO_CLEANUP_INTERVAL = 86400
+MAINTENANCE_INTERVAL = 3600
+
+# SQL kept as constants so sqlite3's statement cache reuses the prepared plans
+SQL_DELETE_OLD_EXECUTIONS = """
+    DELETE FROM executions
+    WHERE rowid IN (
+        SELECT rowid FROM executions
+        WHERE created_at < ?
+        LIMIT ?
+    )
+"""
+
+SQL_DELETE_OLD_RATE_LIMITS = """
+    DELETE FROM rate_limits
+    WHERE rowid IN (
+        SELECT rowid FROM rate_limits
+        WHERE window_start < ?
+        LIMIT ?
+    )
+"""
+
+SQL_DAILY_STATS_EXISTS = "SELECT 1 FROM daily_stats WHERE date = ?"
+
+# Aggregate and upsert a day's stats in one statement; the outer filter
+# skips the write when there were no executions
+SQL_UPSERT_DAILY_STATS = """
+    INSERT OR REPLACE INTO daily_stats
+    (date, total_executions, successful_executions, failed_executions,
+     total_execution_time, total_queue_time, unique_api_keys)
+    SELECT ?, * FROM (
+        SELECT
+            COUNT(*) as total_executions,
+            SUM(CASE WHEN status = 'completed' THEN 1 ELSE 0 END) as successful_executions,
+            SUM(CASE WHEN status IN ('failed', 'timeout') THEN 1 ELSE 0 END) as failed_executions,
+            SUM(execution_time) as total_execution_time,
+            SUM(queue_wait_time) as total_queue_time,
+            COUNT(DISTINCT api_key_id) as unique_api_keys
+        FROM executions
+        WHERE created_at >= ? AND created_at < ?
+    )
+    WHERE total_executions > 0
+    RETURNING total_executions, successful_executions, failed_executions
+"""
+
+SQL_AGGREGATE_DAILY_STATS = """
+    SELECT
+        COUNT(*) as total_executions,
+        SUM(CASE WHEN status = 'completed' THEN 1 ELSE 0 END) as successful_executions,
+        SUM(CASE WHEN status IN ('failed', 'timeout') THEN 1 ELSE 0 END) as failed_executions,
+        SUM(execution_time) as total_execution_time,
+        SUM(queue_wait_time) as total_queue_time,
+        COUNT(DISTINCT api_key_id) as unique_api_keys
+    FROM executions
+    WHERE created_at >= ? AND created_at < ?
+"""
+
+SQL_INSERT_DAILY_STATS = """
+    INSERT OR REPLACE INTO daily_stats
+    (date, total_executions, successful_executions, failed_executions,
+     total_execution_time, total_queue_time, unique_api_keys)
+    VALUES (?, ?, ?, ?, ?, ?, ?)
+"""
+
+SQL_DAILY_STATS_DATES_SINCE = "SELECT date FROM daily_stats WHERE date >= ?"
+
 
 class CleanupService:
     """Background service for cleaning up old data"""
@@ -18,6 +103,14 @@ class CleanupService:
     def __init__(self):
         self.running = False
         self.cleanup_task = None
+        self.cleanup_hour = settings.VIDEO_CLEANUP_HOUR
+        # Deadlines are event loop (monotonic) times, immune to wall-clock jumps
+        self._video_cleanup_deadline: Optional[float] = None
+        self._maintenance_deadline: Optional[float] = None
+        self._next_cleanup_cache: Optional[str] = None
+        self._stop_event: Optional[asyncio.Event] = None
+        # Days whose stats are final (a finished day's executions don't change)
+        self._daily_stats_done: Set[date] = set()
 
     async def start(self):
         """Start the cleanup service"""
@@ -25,26 +118,28 @@ class CleanupService:
             return
 
         self.running = True
+        self._stop_event = asyncio.Event()
+        self.cleanup_hour = settings.VIDEO_CLEANUP_HOUR
 
-        # Schedule cleanup tasks
-        schedule.every().day.at(f"{settings.VIDEO_CLEANUP_HOUR:02d}:00").do(
-            self._schedule_video_cleanup
-        )
-
-        # Schedule hourly maintenance
-        schedule.every().hour.do(self._schedule_maintenance)
+        # Wall-clock math happens once; later runs are fixed monotonic intervals
+        now = asyncio.get_running_loop().time()
+        self._video_cleanup_deadline = now + self._seconds_until_cleanup_hour()
+        self._maintenance_deadline = now + MAINTENANCE_INTERVAL
+        self._next_cleanup_cache = None
 
         # Start background task
         self.cleanup_task = asyncio.create_task(self._cleanup_worker())
 
         system_logger.log_startup("cleanup_service")
         logger.info("Cleanup service started",
-                   video_cleanup_hour=settings.VIDEO_CLEANUP_HOUR,
+                   video_cleanup_hour=self.cleanup_hour,
                    video_retention_days=settings.VIDEO_RETENTION_DAYS)
 
     async def stop(self):
         """Stop the cleanup service"""
         self.running = False
+        if self._stop_event:
+            self._stop_event.set()
 
         if self.cleanup_task:
             self.cleanup_task.cancel()
@@ -53,28 +148,70 @@ class CleanupService:
             except asyncio.CancelledError:
                 pass
 
+        self._video_cleanup_deadline = None
+        self._maintenance_deadline = None
+        self._next_cleanup_cache = None
+
         system_logger.log_shutdown("cleanup_service")
         logger.info("Cleanup service stopped")
 
-    def _schedule_video_cleanup(self):
-        """Schedule video cleanup (called by schedule)"""
-        asyncio.create_task(self.cleanup_old_videos())
+    @asynccontextmanager
+    async def _connection(self, db: Optional[aiosqlite.Connection] = None):
+        """Reuse the caller's connection, or the shared one for a standalone call"""
+        if db is not None:
+            yield db
+            return
 
-    def _schedule_maintenance(self):
-        """Schedule general maintenance (called by schedule)"""
-        asyncio.create_task(self.perform_maintenance())
+        async with get_connection() as conn:
+            yield conn
+
+    def _seconds_until_cleanup_hour(self) -> float:
+        """Seconds from now until the next daily video cleanup hour"""
+        now = datetime.now()
+        next_run = now.replace(hour=self.cleanup_hour, minute=0, second=0, microsecond=0)
+        if next_run <= now:
+            next_run += timedelta(days=1)
+        return (next_run - now).total_seconds()
+
+    async def _delete_in_batches(
+        self, query: str, cutoff: datetime, db: Optional[aiosqlite.Connection] = None
+    ) -> int:
+        """Run a batched DELETE query in short transactions, returning the count"""
+        deleted_count = 0
+        while True:
+            # Take the shared connection per batch so API queries run in between
+            async with self._connection(db) as conn:
+                cursor = await conn.execute(query, (cutoff, DELETE_BATCH_SIZE))
+                await conn.commit()
+            deleted_count += cursor.rowcount
+
+            if cursor.rowcount < DELETE_BATCH_SIZE:
+                return deleted_count
+            await asyncio.sleep(DELETE_BATCH_PAUSE_SECONDS)
 
     async def _cleanup_worker(self):
         """Background worker that runs scheduled tasks"""
         logger.info("Cleanup worker started")
+        loop = asyncio.get_running_loop()
 
         while self.running:
             try:
-                # Run pending scheduled tasks
-                schedule.run_pending()
-
-                # Sleep for 1 minute
-                await asyncio.sleep(60)
+                # Run whichever jobs are due
+                now = loop.time()
+                if now >= self._video_cleanup_deadline:
+                    asyncio.create_task(self.cleanup_old_videos())
+                    self._video_cleanup_deadline += VIDEO_CLEANUP_INTERVAL
+                    self._next_cleanup_cache = None
+                if now >= self._maintenance_deadline:
+                    asyncio.create_task(self.perform_maintenance())
+                    self._maintenance_deadline += MAINTENANCE_INTERVAL
+
+                # Sleep until the next job is due, waking early on stop
+                timeout = min(self._video_cleanup_deadline, self._maintenance_deadline) - loop.time()
+                try:
+                    await asyncio.wait_for(self._stop_event.wait(), timeout=max(timeout, 0))
+                except asyncio.TimeoutError:
+                    pass
 
             except Exception as e:
                 logger.error("Cleanup worker error", error=str(e))
@@ -107,30 +244,21 @@ class CleanupService:
                 "error": str(e)
             }
 
-    async def cleanup_old_executions(self, retention_days: int = 30) -> Dict[str, Any]:
+    async def cleanup_old_executions(
+        self,
+        retention_days: int = 30,
+        db: Optional[aiosqlite.Connection] = None,
+        now: Optional[datetime] = None
+    ) -> Dict[str, Any]:
         """Clean up old execution records from database"""
         try:
-            import aiosqlite
-            from app.config import settings
-
-            cutoff_date = datetime.now() - timedelta(days=retention_days)
-
-            async with aiosqlite.connect(settings.DATABASE_PATH) as db:
-                # Count executions to be deleted
-                async with db.execute("""
-                    SELECT COUNT(*) FROM executions
-                    WHERE created_at < ?
-                """, (cutoff_date,)) as cursor:
-                    count_result = await cursor.fetchone()
-                    count_to_delete = count_result[0] if count_result else 0
-
-                # Delete old executions
-                await db.execute("""
-                    DELETE FROM executions
-                    WHERE created_at < ?
-                """, (cutoff_date,))
+            cutoff_date = (now or datetime.now()) - timedelta(days=retention_days)
 
-                await db.commit()
+            # Delete in small transactions so the writer lock is released
+            # between batches (range scan on idx_executions_created_at)
+            count_to_delete = await self._delete_in_batches(
+                SQL_DELETE_OLD_EXECUTIONS, cutoff_date, db
+            )
 
             logger.info("Execution cleanup completed",
                        deleted_count=count_to_delete,
@@ -150,31 +278,20 @@ class CleanupService:
                 "error": str(e)
             }
 
-    async def cleanup_rate_limit_data(self) -> Dict[str, Any]:
+    async def cleanup_rate_limit_data(
+        self,
+        db: Optional[aiosqlite.Connection] = None,
+        now: Optional[datetime] = None
+    ) -> Dict[str, Any]:
         """Clean up old rate limiting data"""
         try:
-            import aiosqlite
-            from app.config import settings
-
             # Clean up rate limit entries older than 24 hours
-            cutoff_time = datetime.now() - timedelta(hours=24)
-
-            async with aiosqlite.connect(settings.DATABASE_PATH) as db:
-                # Count entries to be deleted
-                async with db.execute("""
-                    SELECT COUNT(*) FROM rate_limits
-                    WHERE window_start < ?
-                """, (cutoff_time,)) as cursor:
-                    count_result = await cursor.fetchone()
-                    count_to_delete = count_result[0] if count_result else 0
-
-                # Delete old rate limit data
-                await db.execute("""
-                    DELETE FROM rate_limits
-                    WHERE window_start < ?
-                """, (cutoff_time,))
+            cutoff_time = (now or datetime.now()) - timedelta(hours=24)
 
-                await db.commit()
+            # Delete old rate limit data
+            count_to_delete = await self._delete_in_batches(
+                SQL_DELETE_OLD_RATE_LIMITS, cutoff_time, db
+            )
 
             logger.info("Rate limit cleanup completed",
                        deleted_count=count_to_delete)
@@ -191,46 +308,41 @@ class CleanupService:
                 "error": str(e)
             }
 
-    async def update_daily_stats(self) -> Dict[str, Any]:
-        """Update daily statistics"""
+    async def update_daily_stats(self, db: Optional[aiosqlite.Connection] = None) -> Dict[str, Any]:
+        """Update daily statistics for the latest settled UTC day"""
         try:
-            import aiosqlite
-            from app.config import settings
-
-            yesterday = (datetime.now() - timedelta(days=1)).date()
-
-            async with aiosqlite.connect(settings.DATABASE_PATH) as db:
-                # Get execution stats for yesterday
-                async with db.execute("""
-                    SELECT
-                        COUNT(*) as total_executions,
-                        SUM(CASE WHEN status = 'completed' THEN 1 ELSE 0 END) as successful_executions,
-                        SUM(CASE WHEN status IN ('failed', 'timeout') THEN 1 ELSE 0 END) as failed_executions,
-                        SUM(execution_time) as total_execution_time,
-                        SUM(queue_wait_time) as total_queue_time,
-                        COUNT(DISTINCT api_key_id) as unique_api_keys
-                    FROM executions
-                    WHERE DATE(created_at) = ?
-                """, (yesterday,)) as cursor:
+            # created_at is UTC, and a day is only final once its executions
+            # can no longer change, so aggregate the last day before the cutoff
+            day = rollup_cutoff() - timedelta(days=1)
+            # Date-string bounds keep the filter a range seek on created_at
+            day_start = day.isoformat()
+            day_end = (day + timedelta(days=1)).isoformat()
+
+            if day in self._daily_stats_done:
+                return {"message": "Daily stats already aggregated", "date": day_start}
+
+            async with self._connection(db) as db:
+                # Survive restarts without re-aggregating a finished day
+                async with db.execute(SQL_DAILY_STATS_EXISTS, (day_start,)) as cursor:
+                    if await cursor.fetchone():
+                        self._daily_stats_done.add(day)
+                        return {"message": "Daily stats already aggregated", "date": day_start}
+
+                # Aggregate and upsert the day's stats
+                async with db.execute(
+                    SQL_UPSERT_DAILY_STATS, (day_start, day_start, day_end)
+                ) as cursor:
                     stats = await cursor.fetchone()
+                await db.commit()
 
-                if stats and stats[0] > 0:
-                    # Insert or update daily stats
-                    await db.execute("""
-                        INSERT OR REPLACE INTO daily_stats
-                        (date, total_executions, successful_executions, failed_executions,
-                         total_execution_time, total_queue_time, unique_api_keys)
-                        VALUES (?, ?, ?, ?, ?, ?, ?)
-                    """, (yesterday, stats[0], stats[1], stats[2], stats[3], stats[4], stats[5]))
-
-                    await db.commit()
-
+                if stats:
+                    self._daily_stats_done.add(day)
                     logger.info("Daily stats updated",
-                               date=yesterday.isoformat(),
+                               date=day_start,
                                total_executions=stats[0])
 
                     return {
-                        "date": yesterday.isoformat(),
+                        "date": day_start,
                         "total_executions": stats[0],
                         "successful_executions": stats[1],
                         "failed_executions": stats[2]
@@ -242,17 +354,124 @@ class CleanupService:
             logger.error("Daily stats update failed", error=str(e))
             return {"error": str(e)}
 
-    async def vacuum_database(self) -> Dict[str, Any]:
-        """Vacuum database to reclaim space"""
+    async def update_execution_rollups(self, db: Optional[aiosqlite.Connection] = None) -> Dict[str, Any]:
+        """Roll settled UTC days into the per-key execution analytics rollups"""
+        try:
+            async with self._connection(db) as db:
+                rolled_up_rows = await rollup_execution_stats(db)
+                await db.commit()
+
+            return {"rolled_up_rows": rolled_up_rows}
+
+        except Exception as e:
+            logger.error("Execution rollup failed", error=str(e))
+            return {"error": str(e)}
+
+    async def _compute_daily_stats(self, db: aiosqlite.Connection, day: date) -> Optional[tuple]:
+        """Aggregate one day's executions into a daily_stats row, or None if there were none"""
+        day_start = day.isoformat()
+        day_end = (day + timedelta(days=1)).isoformat()
+        async with db.execute(SQL_AGGREGATE_DAILY_STATS, (day_start, day_end)) as cursor:
+            stats = await cursor.fetchone()
+        if not stats or not stats[0]:
+            return None
+        return (day_start, *stats)
+
+    async def backfill_daily_stats(
+        self,
+        dates: List[date],
+        db: Optional[aiosqlite.Connection] = None
+    ) -> Dict[str, Any]:
+        """Aggregate several days and write their daily_stats rows in one batch"""
         try:
-            import aiosqlite
-            from app.config import settings
+            # Days that aren't settled yet would be frozen with unfinished
+            # executions, so only settled UTC days are written
+            cutoff = rollup_cutoff()
+            dates = [day for day in dates if day < cutoff]
+
+            async with self._connection(db) as db:
+                # Aggregates run one after another (the shared connection can't
+                # interleave statements); the writes go out as a single executemany
+                rows = []
+                done = []
+                for day in dates:
+                    row = await self._compute_daily_stats(db, day)
+                    if row:
+                        rows.append(row)
+                        done.append(day)
+
+                if rows:
+                    await db.executemany(SQL_INSERT_DAILY_STATS, rows)
+                    await db.commit()
 
-            async with aiosqlite.connect(settings.DATABASE_PATH) as db:
-                await db.execute("VACUUM")
+            # Empty days have no row yet, so they stay eligible
+            self._daily_stats_done.update(done)
 
-            logger.info("Database vacuum completed")
-            return {"message": "Database vacuum completed"}
+            logger.info("Daily stats backfilled",
+                       checked_days=len(dates),
+                       backfilled_days=len(rows))
+            return {
+                "checked_days": len(dates),
+                "backfilled_dates": [row[0] for row in rows]
+            }
+
+        except Exception as e:
+            logger.error("Daily stats backfill failed", error=str(e))
+            return {"error": str(e)}
+
+    async def _missing_daily_stats_dates(self, db: aiosqlite.Connection, until: date) -> List[date]:
+        """Days within the backfill window before until that have no daily_stats row"""
+        first_day = until - timedelta(days=DAILY_STATS_BACKFILL_DAYS)
+        async with db.execute(SQL_DAILY_STATS_DATES_SINCE, (first_day.isoformat(),)) as cursor:
+            existing = {row[0] for row in await cursor.fetchall()}
+        return [
+            day for day in (first_day + timedelta(days=offset) for offset in range(DAILY_STATS_BACKFILL_DAYS))
+            if day.isoformat() not in existing
+        ]
+
+    async def _pragma_value(self, db: aiosqlite.Connection, pragma: str) -> int:
+        """Read a single-valued PRAGMA"""
+        async with db.execute(f"PRAGMA {pragma}") as cursor:
+            return (await cursor.fetchone())[0]
+
+    async def vacuum_database(self, db: Optional[aiosqlite.Connection] = None) -> Dict[str, Any]:
+        """Vacuum database to reclaim space"""
+        try:
+            async with self._connection(db) as db:
+                freelist_count = await self._pragma_value(db, "freelist_count")
+                page_count = await self._pragma_value(db, "page_count")
+                incremental = await self._pragma_value(db, "auto_vacuum") == AUTO_VACUUM_INCREMENTAL
+
+                vacuumed = False
+                if incremental and freelist_count:
+                    # Reclaim free pages in bounded chunks without rewriting the file
+                    # (executescript steps the pragma to completion; execute frees one page)
+                    await db.executescript(f"PRAGMA incremental_vacuum({INCREMENTAL_VACUUM_PAGES});")
+                    vacuumed = True
+                elif page_count and freelist_count / page_count > VACUUM_FREELIST_THRESHOLD:
+                    # Full rewrite; also converts older databases to incremental mode
+                    await db.execute("PRAGMA auto_vacuum=INCREMENTAL")
+                    await db.execute("VACUUM")
+                    vacuumed = True
+
+                reclaimed_pages = freelist_count - await self._pragma_value(db, "freelist_count")
+
+                # Cheap planner statistics refresh
+                await db.execute("PRAGMA optimize")
+
+            logger.info("Database vacuum completed",
+                       vacuumed=vacuumed,
+                       incremental=incremental,
+                       reclaimed_pages=reclaimed_pages,
+                       page_count=page_count)
+            return {
+                "message": "Database vacuum completed" if vacuumed else "Database vacuum skipped",
+                "vacuumed": vacuumed,
+                "incremental": incremental,
+                "freelist_count": freelist_count,
+                "reclaimed_pages": reclaimed_pages,
+                "page_count": page_count
+            }
 
         except Exception as e:
             logger.error("Database vacuum failed", error=str(e))
@@ -264,20 +483,29 @@ class CleanupService:
             logger.info("Starting maintenance tasks")
 
             maintenance_results = {}
+            # One clock read shared by every step of this pass
+            now = datetime.now()
 
+            # Each step takes the shared connection for itself, so API
+            # queries aren't held up for the whole pass
             # Clean up rate limit data
-            rate_limit_result = await self.cleanup_rate_limit_data()
+            rate_limit_result = await self.cleanup_rate_limit_data(now=now)
             maintenance_results["rate_limit_cleanup"] = rate_limit_result
 
             # Update daily stats
             stats_result = await self.update_daily_stats()
             maintenance_results["daily_stats"] = stats_result
 
+            # Roll newly settled days into the analytics rollups
+            maintenance_results["execution_rollups"] = await self.update_execution_rollups()
+
             # Vacuum database (once per day)
-            current_hour = datetime.now().hour
-            if current_hour == settings.VIDEO_CLEANUP_HOUR:
+            if now.hour == self.cleanup_hour:
                 vacuum_result = await self.vacuum_database()
                 maintenance_results["database_vacuum"] = vacuum_result
+            else:
+                # Hourly planner statistics refresh (vacuum runs it itself)
+                await optimize_database()
 
             logger.info("Maintenance tasks completed", results=maintenance_results)
             return maintenance_results
@@ -291,18 +519,26 @@ class CleanupService:
         return {
             "running": self.running,
             "video_retention_days": settings.VIDEO_RETENTION_DAYS,
-            "cleanup_hour": settings.VIDEO_CLEANUP_HOUR,
+            "cleanup_hour": self.cleanup_hour,
             "next_video_cleanup": self._get_next_cleanup_time(),
-            "pending_tasks": len(schedule.jobs)
+            "pending_tasks": sum(
+                deadline is not None
+                for deadline in (self._video_cleanup_deadline, self._maintenance_deadline)
+            )
         }
 
     def _get_next_cleanup_time(self) -> str:
-        """Get next scheduled cleanup time"""
+        """Get next scheduled cleanup time (cached until the deadline moves)"""
+        if self._next_cleanup_cache is not None:
+            return self._next_cleanup_cache
+
         try:
-            next_run = schedule.next_run()
-            if next_run:
-                return next_run.isoformat()
-            return "Not scheduled"
+            if self._video_cleanup_deadline is None:
+                return "Not scheduled"
+            remaining = self._video_cleanup_deadline - asyncio.get_running_loop().time()
+            next_run = datetime.now().replace(microsecond=0) + timedelta(seconds=round(max(remaining, 0)))
+            self._next_cleanup_cache = next_run.isoformat()
+            return self._next_cleanup_cache
         except:
             return "Unknown"
 
@@ -313,21 +549,13 @@ class CleanupService:
 
             results = {}
 
-            # Video cleanup
-            video_result = await self.cleanup_old_videos()
+            # The video walk runs in a worker thread, so purge database rows meanwhile
+            video_result, db_results = await asyncio.gather(
+                self.cleanup_old_videos(),
+                self._cleanup_database()
+            )
             results["video_cleanup"] = video_result
-
-            # Execution cleanup (keep last 30 days)
-            execution_result = await self.cleanup_old_executions(30)
-            results["execution_cleanup"] = execution_result
-
-            # Rate limit cleanup
-            rate_limit_result = await self.cleanup_rate_limit_data()
-            results["rate_limit_cleanup"] = rate_limit_result
-
-            # Database vacuum
-            vacuum_result = await self.vacuum_database()
-            results["database_vacuum"] = vacuum_result
+            results.update(db_results)
 
             logger.info("Forced full cleanup completed", results=results)
             return results
@@ -336,6 +564,34 @@ class CleanupService:
             logger.error("Forced cleanup failed", error=str(e))
             return {"error": str(e)}
 
+    async def _cleanup_database(self) -> Dict[str, Any]:
+        """Purge old executions and rate limit rows, then vacuum"""
+        results = {}
+        now = datetime.now()
+
+        # Statements on the shared connection can't interleave, so these run in
+        # order, each step taking the connection for itself
+        # Fill in days missed during downtime before old executions are purged
+        async with self._connection() as db:
+            missing_dates = await self._missing_daily_stats_dates(db, rollup_cutoff())
+        if missing_dates:
+            results["daily_stats_backfill"] = await self.backfill_daily_stats(missing_dates)
+        results["execution_rollups"] = await self.update_execution_rollups()
+
+        # Execution cleanup (keep last 30 days)
+        execution_result = await self.cleanup_old_executions(30, now=now)
+        results["execution_cleanup"] = execution_result
+
+        # Rate limit cleanup
+        rate_limit_result = await self.cleanup_rate_limit_data(now=now)
+        results["rate_limit_cleanup"] = rate_limit_result
+
+        # Database vacuum
+        vacuum_result = await self.vacuum_database()
+        results["database_vacuum"] = vacuum_result
+
+        return results
+
 
 # Global cleanup service instance
 cleanup_service = CleanupService()
@@ -23,9 +23,16 @@ class Settings(BaseSettings):
     # Rate Limiting
     GLOBAL_RATE_LIMIT_PER_MINUTE: int = 60
     PER_KEY_RATE_LIMIT_PER_MINUTE: int = 30
+    REDIS_URL: str = ""
+
+    # Auth Cache
+    AUTH_CACHE_TTL_SECONDS: int = 30
+    AUTH_CACHE_MAX_ENTRIES: int = 10000
+    USAGE_FLUSH_INTERVAL_SECONDS: int = 5
 
     # Database
     DATABASE_PATH: str = "./data/database.db"
+    DATABASE_READ_POOL_SIZE: int = 4
 
     # Browser Pool
     BROWSER_POOL_SIZE: int = 10
@@ -33,6 +40,7 @@ class Settings(BaseSettings):
 
     # Dashboard
     DASHBOARD_REFRESH_INTERVAL: int = 5
+    DASHBOARD_CACHE_TTL: int = 30
 
     # Webhooks
     MAX_WEBHOOK_RETRIES: int = 3
@@ -44,11 +52,14 @@ class Settings(BaseSettings):
 
     # Security
     ALLOWED_DOMAINS: str = "*"
+    KEY_PEPPER: str = "change-this-key-pepper"
     SCRIPT_TIMEOUT_GRACE_PERIOD: int = 30
 
     class Config:
         env_file = ".env"
         case_sensitive = True
+        # Loaded once at import; nothing mutates settings at runtime
+        frozen = True
 
     def get_allowed_domains(self) -> List[str]:
         if self.ALLOWED_DOMAINS == "*":
@@ -1,20 +1,286 @@
 import sqlite3
+import asyncio
 import aiosqlite
 import hashlib
 import secrets
-import json
-from datetime import datetime, timedelta
-from typing import List, Optional, Dict, Any
+import orjson
+import time
+from pathlib import Path
+from contextlib import asynccontextmanager
+from datetime import date, datetime, timedelta, timezone
+from typing import List, Optional, Dict, Any, Tuple
 from app.config import settings
 from app.models import ApiKeyCreate, ApiKeyResponse, ApiKeyUpdate, ExecutionStatus
 import structlog
 
 logger = structlog.get_logger()
 
+# Hot-path SQL kept as constants so the shared connections' statement
+# caches reuse the prepared plans
+# Columns read into ApiKeyResponse (named, so the digest blob isn't fetched)
+API_KEY_COLUMNS = """
+    id, key_value, name, created_at, last_used, is_active, rate_limit_per_minute,
+    total_requests, scopes, expires_at, webhook_url, notes
+"""
+
+SQL_SELECT_API_KEY_BY_DIGEST = f"SELECT {API_KEY_COLUMNS} FROM api_keys WHERE key_digest = ?"
+SQL_SELECT_API_KEY_BY_ID = f"SELECT {API_KEY_COLUMNS} FROM api_keys WHERE id = ?"
+SQL_LIST_API_KEYS = f"SELECT {API_KEY_COLUMNS} FROM api_keys ORDER BY created_at DESC"
+
+SQL_INSERT_API_KEY = f"""
+    INSERT INTO api_keys (key_value, key_digest, name, rate_limit_per_minute, scopes, expires_at, webhook_url, notes)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+    RETURNING {API_KEY_COLUMNS}
+"""
+
+SQL_UPDATE_API_KEY_USAGE = """
+    UPDATE api_keys
+    SET last_used = ?, total_requests = total_requests + ?
+    WHERE id = ?
+"""
+
+SQL_UPDATE_EXECUTION_STATUS = """
+    UPDATE executions SET
+        status = ?,
+        completed_at = CASE WHEN ? THEN CURRENT_TIMESTAMP ELSE completed_at END,
+        error_message = COALESCE(?, error_message),
+        execution_time = COALESCE(?, execution_time),
+        queue_wait_time = COALESCE(?, queue_wait_time),
+        video_path = COALESCE(?, video_path),
+        video_size_mb = COALESCE(?, video_size_mb),
+        memory_peak_mb = COALESCE(?, memory_peak_mb),
+        cpu_time_ms = COALESCE(?, cpu_time_ms)
+    WHERE request_id = ?
+"""
+
+SQL_MARK_EXECUTION_RUNNING = """
+    UPDATE executions SET status = 'running', queue_wait_time = ?
+    WHERE request_id = ?
+"""
+
+# Roll executions created in [?, ?) up into per-day, per-key totals (UTC days,
+# matching CURRENT_TIMESTAMP in created_at)
+SQL_ROLLUP_EXECUTIONS_BY_KEY = """
+    INSERT OR REPLACE INTO daily_stats_by_key
+    (date, api_key_id, total_executions, successful_executions, failed_executions,
+     total_execution_time, timed_executions, total_video_size_mb)
+    SELECT
+        date(created_at),
+        IFNULL(api_key_id, 0),
+        COUNT(*),
+        SUM(CASE WHEN status = 'completed' THEN 1 ELSE 0 END),
+        SUM(CASE WHEN status IN ('failed', 'timeout') THEN 1 ELSE 0 END),
+        SUM(execution_time),
+        COUNT(execution_time),
+        SUM(video_size_mb)
+    FROM executions
+    WHERE created_at >= ? AND created_at < ?
+    GROUP BY date(created_at), IFNULL(api_key_id, 0)
+"""
+
+# Builtin template names that older versions also seeded into script_templates
+SEEDED_TEMPLATE_NAMES = ("google_search", "form_filling", "screenshot_capture")
+
+# Extra time past MAX_EXECUTION_TIME before a day's executions are final
+ROLLUP_GRACE_SECONDS = 3600
+
+SQL_INSERT_EXECUTION = """
+    INSERT INTO executions (request_id, api_key_id, status, script_hash, script_size, priority, tags)
+    VALUES (?, ?, ?, ?, ?, ?, ?)
+"""
+
+# Per-connection settings (not persisted in the file), applied to every
+# connection: NORMAL sync under WAL means one fsync per commit, and temp
+# tables, sorts and reads stay in memory
+CONNECTION_PRAGMAS = (
+    "synchronous=NORMAL",
+    "temp_store=MEMORY",
+    "mmap_size=268435456",
+)
+
+
+# Refresh planner statistics, sampling at most this many rows per index
+OPTIMIZE_PRAGMAS = ("analysis_limit=1000", "optimize")
+
+
+async def _apply_pragmas(db: aiosqlite.Connection, *pragmas: str):
+    """Run PRAGMA statements on a freshly opened connection"""
+    for pragma in pragmas:
+        await db.execute(f"PRAGMA {pragma}")
+
+
+# Long-lived connection shared by every query, serialized by a lock so a
+# function's statements and commit never interleave with another caller's
+_connection: Optional[aiosqlite.Connection] = None
+_connection_lock = asyncio.Lock()
+
+
+@asynccontextmanager
+async def get_connection():
+    """Acquire the shared database connection (opened on first use)"""
+    global _connection
+    async with _connection_lock:
+        if _connection is None:
+            _connection = await aiosqlite.connect(settings.DATABASE_PATH)
+            _connection.row_factory = aiosqlite.Row
+            # 64MB page cache; prepared statements are reused via sqlite3's statement cache
+            await _apply_pragmas(
+                _connection, "journal_mode=WAL", *CONNECTION_PRAGMAS, "cache_size=-64000"
+            )
+        try:
+            yield _connection
+        except BaseException:
+            # Don't leave a half-done transaction for the next caller's commit
+            await _connection.rollback()
+            raise
+
+
+class ReadPool:
+    """Pool of read-only connections so SELECTs don't queue behind the writer"""
+
+    def __init__(self, size: int):
+        self.size = size
+        self._queue: Optional[asyncio.Queue] = None
+        self._lock = asyncio.Lock()
+
+    async def _open(self) -> asyncio.Queue:
+        """Open the pooled connections (once, after the database file exists)"""
+        async with self._lock:
+            if self._queue is None:
+                uri = f"{Path(settings.DATABASE_PATH).resolve().as_uri()}?mode=ro"
+                queue = asyncio.Queue()
+                for _ in range(self.size):
+                    conn = await aiosqlite.connect(uri, uri=True)
+                    conn.row_factory = aiosqlite.Row
+                    # WAL lets these read alongside the writer connection
+                    await _apply_pragmas(
+                        conn, "query_only=1", *CONNECTION_PRAGMAS, "cache_size=-16000"
+                    )
+                    queue.put_nowait(conn)
+                self._queue = queue
+        return self._queue
+
+    @asynccontextmanager
+    async def acquire(self):
+        """Borrow a read-only connection"""
+        queue = self._queue or await self._open()
+        conn = await queue.get()
+        try:
+            yield conn
+        finally:
+            queue.put_nowait(conn)
+
+    async def close(self):
+        """Close every pooled connection"""
+        async with self._lock:
+            if self._queue is not None:
+                for _ in range(self.size):
+                    await (await self._queue.get()).close()
+                self._queue = None
+
+
+read_pool = ReadPool(settings.DATABASE_READ_POOL_SIZE)
+
+
+# Single-statement writes waiting for the next group commit
+_pending_writes: List[Tuple[str, tuple, asyncio.Future]] = []
+_write_flusher: Optional[asyncio.Task] = None
+
+
+async def _execute_write(sql: str, params: tuple):
+    """Run one write statement; writes queued meanwhile share a single commit"""
+    global _write_flusher
+    future = asyncio.get_running_loop().create_future()
+    _pending_writes.append((sql, params, future))
+    if _write_flusher is None or _write_flusher.done():
+        _write_flusher = asyncio.create_task(_flush_writes())
+    await future
+
+
+async def _flush_writes():
+    """Drain queued writes, one transaction per batch"""
+    batch = []
+    try:
+        while _pending_writes:
+            async with get_connection() as db:
+                # Everything queued while waiting for the connection goes in this batch
+                batch = _pending_writes[:]
+                _pending_writes.clear()
+
+                for sql, params, future in batch:
+                    try:
+                        await db.execute(sql, params)
+                    except Exception as e:
+                        # Only the failed statement is undone; the rest still commit
+                        if not future.done():
+                            future.set_exception(e)
+
+                try:
+                    await db.commit()
+                except Exception as e:
+                    logger.error("Batched database write failed", writes=len(batch), error=str(e))
+                    await db.rollback()
+                    for _, _, future in batch:
+                        if not future.done():
+                            future.set_exception(e)
+                    continue
+
+            for _, _, future in batch:
+                if not future.done():
+                    future.set_result(None)
+    except BaseException as e:
+        # Connection failure or cancellation: nothing else will resolve these,
+        # so hand the error to every waiting caller
+        failed = batch + _pending_writes
+        _pending_writes.clear()
+        if isinstance(e, Exception):
+            logger.error("Batched database write failed", writes=len(failed), error=str(e))
+        for _, _, future in failed:
+            if future.done():
+                continue
+            if isinstance(e, Exception):
+                future.set_exception(e)
+            else:
+                future.cancel()
+        if not isinstance(e, Exception):
+            raise
+
+
+async def close_connection():
+    """Close the shared database connection and the read pool"""
+    global _connection
+    await read_pool.close()
+    async with _connection_lock:
+        if _connection is not None:
+            # Leave fresh sqlite_stat1 data for the next startup
+            try:
+                await _apply_pragmas(_connection, *OPTIMIZE_PRAGMAS)
+            except Exception as e:
+                logger.error("Database optimize failed", error=str(e))
+            await _connection.close()
+            _connection = None
+
+
+async def optimize_database():
+    """Refresh query planner statistics on the shared connection"""
+    async with get_connection() as db:
+        await _apply_pragmas(db, *OPTIMIZE_PRAGMAS)
+
 
 async def init_database():
     """Initialize database with all required tables"""
+    # Own short-lived connection: auto_vacuum must be set before the shared
+    # connection's pragmas touch a brand-new file
     async with aiosqlite.connect(settings.DATABASE_PATH) as db:
+        # Takes effect for new files; existing ones switch on their next VACUUM
+        await db.execute("PRAGMA auto_vacuum=INCREMENTAL")
+
+        # WAL is persistent in the file: readers no longer block on writers and
+        # commits with synchronous=NORMAL need one fsync instead of two
+        await _apply_pragmas(
+            db, "journal_mode=WAL", "wal_autocheckpoint=1000", *CONNECTION_PRAGMAS, "cache_size=-64000"
+        )
+
         # API Keys table
         await db.execute("""
             CREATE TABLE IF NOT EXISTS api_keys (
@@ -29,14 +295,17 @@ async def init_database():
                 scopes TEXT DEFAULT 'execute,videos',
                 expires_at DATETIME,
                 webhook_url TEXT,
-                notes TEXT
+                notes TEXT,
+                key_digest BLOB
             )
         """)
+        await migrate_api_key_digests(db)
 
-        # Executions table
+        # Executions table (rowid-keyed: request_id lookups go through its
+        # unique index, and plain INTEGER PRIMARY KEY skips sqlite_sequence)
         await db.execute("""
             CREATE TABLE IF NOT EXISTS executions (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                id INTEGER PRIMARY KEY,
                 request_id TEXT UNIQUE NOT NULL,
                 api_key_id INTEGER,
                 created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
@@ -57,6 +326,17 @@ async def init_database():
                 FOREIGN KEY (api_key_id) REFERENCES api_keys (id)
             )
         """)
+        await db.execute(
+            "CREATE INDEX IF NOT EXISTS idx_executions_created_at ON executions (created_at)"
+        )
+        await db.execute(
+            "CREATE INDEX IF NOT EXISTS idx_executions_api_key_created ON executions (api_key_id, created_at)"
+        )
+        # Partial covering index: storage totals read only the rows that still have a video
+        await db.execute("""
+            CREATE INDEX IF NOT EXISTS idx_executions_video
+            ON executions (created_at, video_size_mb, video_path) WHERE video_path IS NOT NULL
+        """)
 
         # Daily stats table
         await db.execute("""
@@ -73,6 +353,25 @@ async def init_database():
             )
         """)
 
+        # Per-key daily rollups backing the execution analytics
+        await db.execute("""
+            CREATE TABLE IF NOT EXISTS daily_stats_by_key (
+                api_key_id INTEGER NOT NULL,
+                date DATE NOT NULL,
+                total_executions INTEGER DEFAULT 0,
+                successful_executions INTEGER DEFAULT 0,
+                failed_executions INTEGER DEFAULT 0,
+                total_execution_time REAL DEFAULT 0,
+                timed_executions INTEGER DEFAULT 0,
+                total_video_size_mb REAL DEFAULT 0,
+                PRIMARY KEY (api_key_id, date)
+            ) WITHOUT ROWID
+        """)
+        # Drop days rolled up before their executions could have finished,
+        # then roll up every settled day (reads cover the rest live)
+        await db.execute("DELETE FROM daily_stats_by_key WHERE date >= ?", (rollup_cutoff().isoformat(),))
+        await rollup_execution_stats(db)
+
         # Script templates table
         await db.execute("""
             CREATE TABLE IF NOT EXISTS script_templates (
@@ -94,106 +393,85 @@ async def init_database():
                 window_start DATETIME DEFAULT CURRENT_TIMESTAMP
             )
         """)
+        await db.execute(
+            "CREATE INDEX IF NOT EXISTS idx_rate_limits_window_start ON rate_limits (window_start)"
+        )
 
-        await db.commit()
+        # The default templates are builtins in app.templates; remove the
+        # copies an earlier seed step left in the table
+        await db.execute(
+            "DELETE FROM script_templates WHERE name IN (?, ?, ?)",
+            SEEDED_TEMPLATE_NAMES
+        )
 
-        # Insert default script templates
-        await insert_default_templates(db)
+        await db.commit()
+        await _apply_pragmas(db, *OPTIMIZE_PRAGMAS)
 
         logger.info("Database initialized successfully")
 
 
-async def insert_default_templates(db: aiosqlite.Connection):
-    """Insert default script templates"""
-    templates = [
-        {
-            "name": "google_search",
-            "description": "Busca no Google e retorna resultados",
-            "category": "web_scraping",
-            "script_content": """
-async def main():
-    await page.goto('https://google.com')
-    await page.fill('input[name="q"]', 'playwright automation')
-    await page.press('input[name="q"]', 'Enter')
-    await page.wait_for_selector('.g')
-    results = await page.query_selector_all('.g h3')
-    return [await r.inner_text() for r in results[:5]]
-"""
-        },
-        {
-            "name": "form_filling",
-            "description": "Preenche formulário e submete",
-            "category": "automation",
-            "script_content": """
-async def main():
-    await page.goto('https://httpbin.org/forms/post')
-    await page.fill('input[name="custname"]', 'Test User')
-    await page.fill('input[name="custtel"]', '123456789')
-    await page.fill('input[name="custemail"]', 'test@example.com')
-    await page.click('input[type="submit"]')
-    await page.wait_for_load_state('networkidle')
-    return await page.text_content('body')
-"""
-        },
-        {
-            "name": "screenshot_capture",
-            "description": "Navega e captura informações da página",
-            "category": "testing",
-            "script_content": """
-async def main():
-    await page.goto('https://example.com')
-    title = await page.title()
-    content = await page.text_content('body')
-    return {
-        'title': title,
-        'content_length': len(content),
-        'url': page.url,
-        'viewport': await page.viewport_size()
-    }
-"""
-        }
-    ]
+async def migrate_api_key_digests(db: aiosqlite.Connection):
+    """Add the key_digest column if missing and (re)compute digests for all keys"""
+    async with db.execute("PRAGMA table_info(api_keys)") as cursor:
+        columns = [row[1] for row in await cursor.fetchall()]
 
-    for template in templates:
-        await db.execute("""
-            INSERT OR IGNORE INTO script_templates (name, description, category, script_content)
-            VALUES (?, ?, ?, ?)
-        """, (template["name"], template["description"], template["category"], template["script_content"]))
+    if "key_digest" not in columns:
+        await db.execute("ALTER TABLE api_keys ADD COLUMN key_digest BLOB")
+
+    # Recompute every digest so a changed KEY_PEPPER takes effect
+    async with db.execute("SELECT id, key_value FROM api_keys") as cursor:
+        rows = await cursor.fetchall()
+    await db.executemany(
+        "UPDATE api_keys SET key_digest = ? WHERE id = ?",
+        [(hash_api_key(key_value), key_id) for key_id, key_value in rows]
+    )
+
+    await db.execute(
+        "CREATE UNIQUE INDEX IF NOT EXISTS idx_api_keys_key_digest ON api_keys (key_digest)"
+    )
+
+
+# Fixed-width BLAKE2b key derived from the configured pepper
+_KEY_PEPPER = hashlib.sha256(settings.KEY_PEPPER.encode()).digest()
+
+
+def hash_api_key(key_value: str) -> bytes:
+    """Keyed 16-byte digest used to look up API keys without comparing secrets"""
+    return hashlib.blake2b(key_value.encode(), digest_size=16, key=_KEY_PEPPER).digest()
 
 
 def generate_api_key() -> str:
     """Generate a secure API key"""
-    return f"pk_{''.join(secrets.choice('abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789') for _ in range(48))}"
+    # 36 random bytes -> 48 URL-safe characters in a single urandom call
+    return f"pk_{secrets.token_urlsafe(36)}"
 
 
 async def create_api_key(key_data: ApiKeyCreate) -> ApiKeyResponse:
     """Create a new API key"""
-    async with aiosqlite.connect(settings.DATABASE_PATH) as db:
+    async with get_connection() as db:
         key_value = generate_api_key()
         scopes_str = ",".join(key_data.scopes)
 
-        cursor = await db.execute("""
-            INSERT INTO api_keys (key_value, name, rate_limit_per_minute, scopes, expires_at, webhook_url, notes)
-            VALUES (?, ?, ?, ?, ?, ?, ?)
-        """, (
-            key_value, key_data.name, key_data.rate_limit_per_minute,
+        # RETURNING hands back the stored row, so no re-SELECT is needed
+        async with db.execute(SQL_INSERT_API_KEY, (
+            key_value, hash_api_key(key_value), key_data.name, key_data.rate_limit_per_minute,
             scopes_str, key_data.expires_at, key_data.webhook_url, key_data.notes
-        ))
-
-        key_id = cursor.lastrowid
-        await db.commit()
-
-        # Fetch the created key
-        async with db.execute("SELECT * FROM api_keys WHERE id = ?", (key_id,)) as cursor:
+        )) as cursor:
             row = await cursor.fetchone()
+        await db.commit()
 
         return _row_to_api_key_response(row)
 
 
 async def get_api_key_by_value(key_value: str) -> Optional[ApiKeyResponse]:
     """Get API key by its value"""
-    async with aiosqlite.connect(settings.DATABASE_PATH) as db:
-        async with db.execute("SELECT * FROM api_keys WHERE key_value = ?", (key_value,)) as cursor:
+    return await get_api_key_by_digest(hash_api_key(key_value))
+
+
+async def get_api_key_by_digest(key_digest: bytes) -> Optional[ApiKeyResponse]:
+    """Get API key by the digest of its value"""
+    async with read_pool.acquire() as db:
+        async with db.execute(SQL_SELECT_API_KEY_BY_DIGEST, (key_digest,)) as cursor:
             row = await cursor.fetchone()
 
         if row:
@@ -203,8 +481,8 @@ async def get_api_key_by_value(key_value: str) -> Optional[ApiKeyResponse]:
 
 async def get_api_key_by_id(key_id: int) -> Optional[ApiKeyResponse]:
     """Get API key by its ID"""
-    async with aiosqlite.connect(settings.DATABASE_PATH) as db:
-        async with db.execute("SELECT * FROM api_keys WHERE id = ?", (key_id,)) as cursor:
+    async with read_pool.acquire() as db:
+        async with db.execute(SQL_SELECT_API_KEY_BY_ID, (key_id,)) as cursor:
             row = await cursor.fetchone()
 
         if row:
@@ -214,88 +492,100 @@ async def get_api_key_by_id(key_id: int) -> Optional[ApiKeyResponse]:
 
 async def list_api_keys() -> List[ApiKeyResponse]:
     """List all API keys"""
-    async with aiosqlite.connect(settings.DATABASE_PATH) as db:
-        async with db.execute("SELECT * FROM api_keys ORDER BY created_at DESC") as cursor:
-            rows = await cursor.fetchall()
+    async with read_pool.acquire() as db:
+        # Convert rows as they arrive (in chunks) instead of holding them all first
+        async with db.execute(SQL_LIST_API_KEYS) as cursor:
+            return [_row_to_api_key_response(row) async for row in cursor]
 
-        return [_row_to_api_key_response(row) for row in rows]
+
+async def count_api_keys() -> int:
+    """Count API keys without loading them"""
+    async with read_pool.acquire() as db:
+        async with db.execute("SELECT COUNT(*) FROM api_keys") as cursor:
+            return (await cursor.fetchone())[0]
 
 
 async def update_api_key(key_id: int, update_data: ApiKeyUpdate) -> Optional[ApiKeyResponse]:
     """Update an API key"""
-    async with aiosqlite.connect(settings.DATABASE_PATH) as db:
-        # Build update query dynamically
-        update_fields = []
-        values = []
+    # Build update query dynamically
+    update_fields = []
+    values = []
 
-        if update_data.name is not None:
-            update_fields.append("name = ?")
-            values.append(update_data.name)
+    if update_data.name is not None:
+        update_fields.append("name = ?")
+        values.append(update_data.name)
 
-        if update_data.is_active is not None:
-            update_fields.append("is_active = ?")
-            values.append(update_data.is_active)
+    if update_data.is_active is not None:
+        update_fields.append("is_active = ?")
+        values.append(update_data.is_active)
 
-        if update_data.rate_limit_per_minute is not None:
-            update_fields.append("rate_limit_per_minute = ?")
-            values.append(update_data.rate_limit_per_minute)
+    if update_data.rate_limit_per_minute is not None:
+        update_fields.append("rate_limit_per_minute = ?")
+        values.append(update_data.rate_limit_per_minute)
 
-        if update_data.scopes is not None:
-            update_fields.append("scopes = ?")
-            values.append(",".join(update_data.scopes))
+    if update_data.scopes is not None:
+        update_fields.append("scopes = ?")
+        values.append(",".join(update_data.scopes))
 
-        if update_data.expires_at is not None:
-            update_fields.append("expires_at = ?")
-            values.append(update_data.expires_at)
+    if update_data.expires_at is not None:
+        update_fields.append("expires_at = ?")
+        values.append(update_data.expires_at)
 
-        if update_data.webhook_url is not None:
-            update_fields.append("webhook_url = ?")
-            values.append(update_data.webhook_url)
+    if update_data.webhook_url is not None:
+        update_fields.append("webhook_url = ?")
+        values.append(update_data.webhook_url)
 
-        if update_data.notes is not None:
-            update_fields.append("notes = ?")
-            values.append(update_data.notes)
+    if update_data.notes is not None:
+        update_fields.append("notes = ?")
+        values.append(update_data.notes)
 
-        if not update_fields:
-            return await get_api_key_by_id(key_id)
+    if not update_fields:
+        return await get_api_key_by_id(key_id)
 
-        values.append(key_id)
-        query = f"UPDATE api_keys SET {', '.join(update_fields)} WHERE id = ?"
+    values.append(key_id)
+    query = f"UPDATE api_keys SET {', '.join(update_fields)} WHERE id = ? RETURNING {API_KEY_COLUMNS}"
 
-        await db.execute(query, values)
+    async with get_connection() as db:
+        async with db.execute(query, values) as cursor:
+            row = await cursor.fetchone()
         await db.commit()
 
-        return await get_api_key_by_id(key_id)
+    return _row_to_api_key_response(row) if row else None
 
 
 async def delete_api_key(key_id: int) -> bool:
     """Delete an API key"""
-    async with aiosqlite.connect(settings.DATABASE_PATH) as db:
+    async with get_connection() as db:
         cursor = await db.execute("DELETE FROM api_keys WHERE id = ?", (key_id,))
         await db.commit()
-        return cursor.rowcount > 0
+    _analytics_cache.pop(key_id, None)
+    return cursor.rowcount > 0
 
 
-async def update_api_key_usage(key_value: str):
-    """Update API key last used timestamp and request count"""
-    async with aiosqlite.connect(settings.DATABASE_PATH) as db:
-        await db.execute("""
-            UPDATE api_keys
-            SET last_used = CURRENT_TIMESTAMP, total_requests = total_requests + 1
-            WHERE key_value = ?
-        """, (key_value,))
+async def update_api_key_usage(usage: List[Tuple[int, float, int]]):
+    """Apply batched API key usage as (request_count, last_used_timestamp, key_id)"""
+    # Match the CURRENT_TIMESTAMP format (UTC, second precision)
+    rows = [
+        (datetime.utcfromtimestamp(last_used).strftime("%Y-%m-%d %H:%M:%S"), count, key_id)
+        for count, last_used, key_id in usage
+    ]
+    async with get_connection() as db:
+        await db.executemany(SQL_UPDATE_API_KEY_USAGE, rows)
         await db.commit()
 
 
 async def record_execution(request_id: str, api_key_id: int, script_hash: str,
-                          script_size: int, priority: int, tags: List[str]):
+                          script_size: int, priority: int, tags: List[str],
+                          initial_status: ExecutionStatus = ExecutionStatus.QUEUED):
     """Record a new execution"""
-    async with aiosqlite.connect(settings.DATABASE_PATH) as db:
-        await db.execute("""
-            INSERT INTO executions (request_id, api_key_id, status, script_hash, script_size, priority, tags)
-            VALUES (?, ?, ?, ?, ?, ?, ?)
-        """, (request_id, api_key_id, ExecutionStatus.QUEUED, script_hash, script_size, priority, json.dumps(tags)))
-        await db.commit()
+    # Most executions are untagged; store NULL rather than "[]"
+    tags_json = orjson.dumps(tags).decode() if tags else None
+    await _execute_write(SQL_INSERT_EXECUTION, (request_id, api_key_id, initial_status, script_hash, script_size, priority, tags_json))
+
+
+async def mark_running(request_id: str, queue_wait_time: float):
+    """Move a queued execution to running"""
+    await _execute_write(SQL_MARK_EXECUTION_RUNNING, (queue_wait_time, request_id))
 
 
 async def update_execution_status(request_id: str, status: ExecutionStatus,
@@ -307,106 +597,169 @@ async def update_execution_status(request_id: str, status: ExecutionStatus,
                                 memory_peak_mb: Optional[float] = None,
                                 cpu_time_ms: Optional[int] = None):
     """Update execution status and metrics"""
-    async with aiosqlite.connect(settings.DATABASE_PATH) as db:
-        update_fields = ["status = ?"]
-        values = [status]
-
-        if status in [ExecutionStatus.COMPLETED, ExecutionStatus.FAILED, ExecutionStatus.TIMEOUT]:
-            update_fields.append("completed_at = CURRENT_TIMESTAMP")
+    # One fixed statement for every call; None leaves the column unchanged
+    await _execute_write(SQL_UPDATE_EXECUTION_STATUS, (
+        status,
+        status in (ExecutionStatus.COMPLETED, ExecutionStatus.FAILED, ExecutionStatus.TIMEOUT),
+        error_message or None,
+        execution_time,
+        queue_wait_time,
+        video_path or None,
+        video_size_mb,
+        memory_peak_mb,
+        cpu_time_ms,
+        request_id
+    ))
+
+
+async def clear_video_paths(request_ids: List[str], batch_size: int = 500):
+    """Mark videos of the given executions as deleted in one transaction"""
+    if not request_ids:
+        return
+
+    async with get_connection() as db:
+        for i in range(0, len(request_ids), batch_size):
+            batch = request_ids[i:i + batch_size]
+            placeholders = ",".join("?" * len(batch))
+            await db.execute(
+                f"UPDATE executions SET video_path = NULL WHERE request_id IN ({placeholders})",
+                batch
+            )
+        await db.commit()
 
-        if error_message:
-            update_fields.append("error_message = ?")
-            values.append(error_message)
 
-        if execution_time is not None:
-            update_fields.append("execution_time = ?")
-            values.append(execution_time)
+async def get_video_storage_totals() -> Dict[str, Any]:
+    """Aggregate stored video count, size and age range from execution records"""
+    async with read_pool.acquire() as db:
+        async with db.execute("""
+            SELECT COUNT(*), COALESCE(SUM(video_size_mb), 0), MIN(created_at), MAX(created_at)
+            FROM executions
+            WHERE video_path IS NOT NULL
+        """) as cursor:
+            row = await cursor.fetchone()
 
-        if queue_wait_time is not None:
-            update_fields.append("queue_wait_time = ?")
-            values.append(queue_wait_time)
+    return {
+        "total_files": row[0],
+        "total_size_mb": row[1],
+        "oldest_video": datetime.fromisoformat(row[2]) if row[2] else None,
+        "newest_video": datetime.fromisoformat(row[3]) if row[3] else None,
+    }
 
-        if video_path:
-            update_fields.append("video_path = ?")
-            values.append(video_path)
 
-        if video_size_mb is not None:
-            update_fields.append("video_size_mb = ?")
-            values.append(video_size_mb)
+def rollup_cutoff() -> date:
+    """First UTC day that may still have unfinished executions"""
+    # A day is settled once it ended longer ago than the longest run plus a
+    # grace period for queue wait, so its rolled-up statuses can't change
+    settle_seconds = settings.MAX_EXECUTION_TIME + ROLLUP_GRACE_SECONDS
+    return (datetime.now(timezone.utc) - timedelta(seconds=settle_seconds)).date()
 
-        if memory_peak_mb is not None:
-            update_fields.append("memory_peak_mb = ?")
-            values.append(memory_peak_mb)
 
-        if cpu_time_ms is not None:
-            update_fields.append("cpu_time_ms = ?")
-            values.append(cpu_time_ms)
+async def rollup_execution_stats(db: aiosqlite.Connection) -> int:
+    """Roll settled days since the last rollup into daily_stats_by_key (caller commits)"""
+    async with db.execute("SELECT MAX(date) FROM daily_stats_by_key") as cursor:
+        last_rollup = (await cursor.fetchone())[0]
+    # Starting after the last rolled-up day keeps the rollups gap-free after downtime
+    start = (date.fromisoformat(last_rollup) + timedelta(days=1)).isoformat() if last_rollup else ""
+    cursor = await db.execute(SQL_ROLLUP_EXECUTIONS_BY_KEY, (start, rollup_cutoff().isoformat()))
+    return cursor.rowcount
 
-        values.append(request_id)
-        query = f"UPDATE executions SET {', '.join(update_fields)} WHERE request_id = ?"
 
-        await db.execute(query, values)
-        await db.commit()
+# Execution analytics per api_key_id (None = all keys) -> (monotonic_ts, result)
+_analytics_cache: Dict[Optional[int], Tuple[float, Dict[str, Any]]] = {}
 
 
 async def get_execution_analytics(api_key_id: Optional[int] = None) -> Dict[str, Any]:
-    """Get execution analytics"""
-    async with aiosqlite.connect(settings.DATABASE_PATH) as db:
-        base_query = """
-            SELECT
-                COUNT(*) as total_executions,
-                SUM(CASE WHEN status = 'completed' THEN 1 ELSE 0 END) as successful_executions,
-                SUM(CASE WHEN status IN ('failed', 'timeout') THEN 1 ELSE 0 END) as failed_executions,
-                AVG(execution_time) as avg_execution_time,
-                SUM(video_size_mb) as total_video_size_mb
-            FROM executions
-        """
+    """Get execution analytics (cached for DASHBOARD_CACHE_TTL seconds)"""
+    now = time.monotonic()
+    cached = _analytics_cache.get(api_key_id)
+    if cached and now - cached[0] < settings.DASHBOARD_CACHE_TTL:
+        return dict(cached[1])
 
-        if api_key_id:
-            base_query += " WHERE api_key_id = ?"
-            values = (api_key_id,)
-        else:
-            values = ()
+    analytics = await _query_execution_analytics(api_key_id)
+    _analytics_cache[api_key_id] = (now, analytics)
+    return dict(analytics)
 
-        async with db.execute(base_query, values) as cursor:
-            row = await cursor.fetchone()
 
-        return {
-            "total_executions": row[0] or 0,
-            "successful_executions": row[1] or 0,
-            "failed_executions": row[2] or 0,
-            "avg_execution_time": row[3] or 0.0,
-            "total_video_size_mb": row[4] or 0.0
-        }
+async def _query_execution_analytics(api_key_id: Optional[int]) -> Dict[str, Any]:
+    """Aggregate execution analytics from daily rollups plus not-yet-rolled-up executions"""
+    key_filter = " AND api_key_id = ?" if api_key_id else ""
+    key_values = (api_key_id,) if api_key_id else ()
+
+    async with read_pool.acquire() as db:
+        async with db.execute("SELECT MAX(date) FROM daily_stats_by_key") as cursor:
+            last_rollup = (await cursor.fetchone())[0]
+        # Executions from the day after the last rollup on are read directly
+        live_from = (date.fromisoformat(last_rollup) + timedelta(days=1)).isoformat() if last_rollup else ""
+
+        async with db.execute(f"""
+            SELECT
+                SUM(total_executions),
+                SUM(successful_executions),
+                SUM(failed_executions),
+                SUM(total_execution_time),
+                SUM(timed_executions),
+                SUM(total_video_size_mb)
+            FROM daily_stats_by_key
+            WHERE date < ?{key_filter}
+        """, (live_from, *key_values)) as cursor:
+            rolled = await cursor.fetchone()
+
+        async with db.execute(f"""
+            SELECT
+                COUNT(*),
+                SUM(CASE WHEN status = 'completed' THEN 1 ELSE 0 END),
+                SUM(CASE WHEN status IN ('failed', 'timeout') THEN 1 ELSE 0 END),
+                SUM(execution_time),
+                COUNT(execution_time),
+                SUM(video_size_mb)
+            FROM executions
+            WHERE created_at >= ?{key_filter}
+        """, (live_from, *key_values)) as cursor:
+            live = await cursor.fetchone()
+
+    total_executions, successful, failed, execution_time, timed, video_size_mb = (
+        (a or 0) + (b or 0) for a, b in zip(rolled, live)
+    )
+    return {
+        "total_executions": total_executions,
+        "successful_executions": successful,
+        "failed_executions": failed,
+        "avg_execution_time": execution_time / timed if timed else 0.0,
+        "total_video_size_mb": video_size_mb or 0.0
+    }
 
 
 async def ensure_admin_key():
     """Ensure admin API key exists"""
-    admin_key = await get_api_key_by_value(settings.ADMIN_API_KEY)
-    if not admin_key:
-        async with aiosqlite.connect(settings.DATABASE_PATH) as db:
-            await db.execute("""
-                INSERT INTO api_keys (key_value, name, scopes, rate_limit_per_minute)
-                VALUES (?, ?, ?, ?)
-            """, (settings.ADMIN_API_KEY, "Admin Key", "admin,execute,videos,dashboard", 1000))
-            await db.commit()
-            logger.info("Admin API key created")
+    async with get_connection() as db:
+        cursor = await db.execute("""
+            INSERT INTO api_keys (key_value, key_digest, name, scopes, rate_limit_per_minute)
+            VALUES (?, ?, ?, ?, ?)
+            ON CONFLICT DO NOTHING
+        """, (settings.ADMIN_API_KEY, hash_api_key(settings.ADMIN_API_KEY), "Admin Key", "admin,execute,videos,dashboard", 1000))
+        await db.commit()
+
+    if cursor.rowcount > 0:
+        logger.info("Admin API key created")
 
 
 def _row_to_api_key_response(row) -> ApiKeyResponse:
     """Convert database row to ApiKeyResponse"""
-    scopes = row[8].split(",") if row[8] else []
-    return ApiKeyResponse(
-        id=row[0],
-        key_value=row[1],
-        name=row[2],
-        created_at=datetime.fromisoformat(row[3]),
-        last_used=datetime.fromisoformat(row[4]) if row[4] else None,
-        is_active=bool(row[5]),
-        rate_limit_per_minute=row[6],
-        total_requests=row[7],
+    scopes = row["scopes"].split(",") if row["scopes"] else []
+    last_used = row["last_used"]
+    expires_at = row["expires_at"]
+    # Rows come from our own schema, so skip pydantic validation
+    return ApiKeyResponse.model_construct(
+        id=row["id"],
+        key_value=row["key_value"],
+        name=row["name"],
+        created_at=datetime.fromisoformat(row["created_at"]),
+        last_used=datetime.fromisoformat(last_used) if last_used else None,
+        is_active=bool(row["is_active"]),
+        rate_limit_per_minute=row["rate_limit_per_minute"],
+        total_requests=row["total_requests"],
         scopes=scopes,
-        expires_at=datetime.fromisoformat(row[9]) if row[9] else None,
-        webhook_url=row[10],
-        notes=row[11]
-    )
\ No newline at end of file
+        expires_at=datetime.fromisoformat(expires_at) if expires_at else None,
+        webhook_url=row["webhook_url"],
+        notes=row["notes"]
+    )
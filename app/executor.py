@@ -1,15 +1,18 @@
 import asyncio
 import uuid
 import hashlib
+import heapq
+import itertools
 import json
 import time
 import psutil
 import ast
 import os
-import shutil
 from datetime import datetime
-from typing import Dict, Any, Optional, List, Callable
+from types import CodeType
+from typing import Dict, Any, Optional, List, Callable, Tuple
 from dataclasses import dataclass, field
+from collections import OrderedDict
 from playwright.async_api import async_playwright, Browser, BrowserContext, Page
 import structlog
 
@@ -22,13 +25,19 @@ from app.models import (
     ResourceUsage,
     ScriptAnalysis,
 )
-from app.database import record_execution, update_execution_status
+from app.database import mark_running, record_execution, update_execution_status
 from app.logger import execution_logger
 from app.video_service import VideoService
 
 
 logger = structlog.get_logger()
 
+# Scripts larger than this are hashed and parsed in a worker thread
+SCRIPT_OFFLOAD_SIZE = 4096
+
+# Compiled code objects kept for repeat runs of the same script
+SCRIPT_CODE_CACHE_SIZE = 256
+
 
 @dataclass
 class QueueItem:
@@ -43,12 +52,32 @@ class QueueItem:
     created_at: float
     position: int = 0
     estimated_duration: float = 60.0
+    script_hash: str = ""
+    # Recorded as running up front, so the worker skips the status update
+    recorded_running: bool = False
+    # Compiled when queued, off the event loop for large scripts
+    code: Optional[CodeType] = None
+
+
+class ExecutionQueue(asyncio.Queue):
+    """Queue of QueueItems served highest priority first, then FIFO"""
+
+    # asyncio.Queue's storage hooks, overridden the way PriorityQueue does;
+    # entries are (-priority, created_at, seq, item) so the item itself is
+    # never compared
+    def _init(self, maxsize):
+        self._queue: List[Tuple[int, float, int, QueueItem]] = []
+        self._seq = itertools.count()
+
+    def _put(self, item: QueueItem):
+        heapq.heappush(self._queue, (-item.priority, item.created_at, next(self._seq), item))
 
-    def __lt__(self, other):
-        # Higher priority first, then FIFO
-        if self.priority != other.priority:
-            return self.priority > other.priority
-        return self.created_at < other.created_at
+    def _get(self) -> QueueItem:
+        return heapq.heappop(self._queue)[-1]
+
+    def peek(self, n: int) -> List[QueueItem]:
+        """The next n items in dispatch order, without removing them"""
+        return [entry[-1] for entry in heapq.nsmallest(n, self._queue)]
 
 
 @dataclass
@@ -79,14 +108,18 @@ class BrowserPool:
         """Initialize browser pool"""
         self.playwright = await async_playwright().start()
 
-        for i in range(self.pool_size):
-            try:
-                browser = await self._create_browser()
-                self.browsers.append(browser)
-                self.available_browsers.append(browser)
-                execution_logger.log_browser_event("created", f"browser_{i}")
-            except Exception as e:
-                logger.error("Failed to create browser", browser_index=i, error=str(e))
+        # Launch all browsers concurrently
+        results = await asyncio.gather(
+            *(self._create_browser() for _ in range(self.pool_size)),
+            return_exceptions=True,
+        )
+        for i, result in enumerate(results):
+            if isinstance(result, BaseException):
+                logger.error("Failed to create browser", browser_index=i, error=str(result))
+                continue
+            self.browsers.append(result)
+            self.available_browsers.append(result)
+            execution_logger.log_browser_event("created", f"browser_{i}")
 
         logger.info(
             "Browser pool initialized",
@@ -120,45 +153,48 @@ class BrowserPool:
                 )
                 return browser
 
-            # If no browsers available, create a new one
-            try:
-                browser = await self._create_browser()
-                execution_logger.log_browser_event(
-                    "created_on_demand", browser_id=str(id(browser))
-                )
-                return browser
-            except Exception as e:
-                logger.error("Failed to create browser on demand", error=str(e))
-                raise
+        # If no browsers available, create a new one (outside the lock, so
+        # concurrent executions don't wait on each other's launches)
+        try:
+            browser = await self._create_browser()
+            execution_logger.log_browser_event(
+                "created_on_demand", browser_id=str(id(browser))
+            )
+            return browser
+        except Exception as e:
+            logger.error("Failed to create browser on demand", error=str(e))
+            raise
 
     async def return_browser(self, browser: Browser):
         """Return a browser to the pool"""
-        async with self._lock:
-            try:
-                # Check if browser is still healthy
-                if not browser.is_connected():
-                    await browser.close()
-                    # Replace with new browser
-                    new_browser = await self._create_browser()
+        try:
+            # Check if browser is still healthy
+            if not browser.is_connected():
+                # Close and relaunch outside the lock; only the list append needs it
+                await browser.close()
+                # Replace with new browser
+                new_browser = await self._create_browser()
+                async with self._lock:
                     self.available_browsers.append(new_browser)
-                    execution_logger.log_browser_event(
-                        "replaced",
-                        old_browser_id=str(id(browser)),
-                        new_browser_id=str(id(new_browser)),
-                    )
-                else:
+                execution_logger.log_browser_event(
+                    "replaced",
+                    old_browser_id=str(id(browser)),
+                    new_browser_id=str(id(new_browser)),
+                )
+            else:
+                async with self._lock:
                     self.available_browsers.append(browser)
-                    execution_logger.log_browser_event(
-                        "returned", browser_id=str(id(browser))
-                    )
+                execution_logger.log_browser_event(
+                    "returned", browser_id=str(id(browser))
+                )
 
-            except Exception as e:
-                logger.error("Failed to return browser", error=str(e))
-                # Close the problematic browser
-                try:
-                    await browser.close()
-                except:
-                    pass
+        except Exception as e:
+            logger.error("Failed to return browser", error=str(e))
+            # Close the problematic browser
+            try:
+                await browser.close()
+            except:
+                pass
 
     async def health_check(self) -> Dict[str, Any]:
         """Check health of browser pool"""
@@ -281,11 +317,28 @@ class PlaywrightExecutor:
         self.browser_pool = BrowserPool(settings.BROWSER_POOL_SIZE)
         self.video_service = VideoService()
         self.validator = ScriptValidator()
-        self.execution_queue: asyncio.PriorityQueue = asyncio.PriorityQueue(
+        self.execution_queue = ExecutionQueue(
             maxsize=settings.MAX_QUEUE_SIZE
         )
         self.active_executions: Dict[str, asyncio.Task] = {}
+        # Items recorded as running that no worker has picked up yet
+        self._reserved_slots = 0
         self.queue_position = 0
+        self._process = psutil.Process()
+        self._code_cache: "OrderedDict[str, CodeType]" = OrderedDict()
+        # Every execution records video, so contexts can't be reused; build
+        # the shared options once instead
+        self._context_options = {
+            "viewport": {
+                "width": settings.VIDEO_WIDTH,
+                "height": settings.VIDEO_HEIGHT,
+            },
+            "record_video_dir": "./data/videos",
+            "record_video_size": {
+                "width": settings.VIDEO_WIDTH,
+                "height": settings.VIDEO_HEIGHT,
+            },
+        }
         self._running = False
         self._worker_tasks: List[asyncio.Task] = []
 
@@ -309,10 +362,15 @@ class PlaywrightExecutor:
     async def queue_script(self, request: ScriptRequest, api_key_id: int) -> str:
         """Queue a script for execution"""
         request_id = str(uuid.uuid4())
-        script_hash = hashlib.sha256(request.script.encode()).hexdigest()
 
-        # Validate script
-        script_analysis = self.validator.validate(request.script)
+        # Hash, validate and compile script (parsing is CPU-bound, so big
+        # scripts are handled off the event loop)
+        if len(request.script) > SCRIPT_OFFLOAD_SIZE:
+            script_hash, script_analysis, code = await asyncio.to_thread(self._prepare_script, request.script)
+        else:
+            script_hash, script_analysis, code = self._prepare_script(request.script)
+        if code is not None:
+            self._cache_code(script_hash, code)
 
         if script_analysis.security_warnings:
             logger.warning(
@@ -321,15 +379,32 @@ class PlaywrightExecutor:
                 warnings=script_analysis.security_warnings,
             )
 
-        # Record in database
-        await record_execution(
-            request_id=request_id,
-            api_key_id=api_key_id,
-            script_hash=script_hash,
-            script_size=len(request.script),
-            priority=request.priority,
-            tags=request.tags,
+        # An idle worker will take this right away, so record it as running
+        # in the same INSERT instead of a follow-up UPDATE. The slot is reserved
+        # before any await so concurrent submissions can't all claim it.
+        recorded_running = (
+            self.execution_queue.empty()
+            and len(self.active_executions) + self._reserved_slots
+            < settings.MAX_CONCURRENT_EXECUTIONS
         )
+        if recorded_running:
+            self._reserved_slots += 1
+
+        # Record in database
+        try:
+            await record_execution(
+                request_id=request_id,
+                api_key_id=api_key_id,
+                script_hash=script_hash,
+                script_size=len(request.script),
+                priority=request.priority,
+                tags=request.tags,
+                initial_status=ExecutionStatus.RUNNING if recorded_running else ExecutionStatus.QUEUED,
+            )
+        except BaseException:
+            if recorded_running:
+                self._reserved_slots -= 1
+            raise
 
         # Create queue item
         queue_item = QueueItem(
@@ -343,6 +418,9 @@ class PlaywrightExecutor:
             user_agent=request.user_agent,
             created_at=time.time(),
             position=self.queue_position,
+            recorded_running=recorded_running,
+            script_hash=script_hash,
+            code=code,
         )
 
         self.queue_position += 1
@@ -357,6 +435,8 @@ class PlaywrightExecutor:
                 priority=request.priority,
             )
         except asyncio.QueueFull:
+            if recorded_running:
+                self._reserved_slots -= 1
             await update_execution_status(
                 request_id, ExecutionStatus.FAILED, error_message="Queue is full"
             )
@@ -364,16 +444,39 @@ class PlaywrightExecutor:
 
         return request_id
 
+    def _prepare_script(self, script: str) -> Tuple[str, ScriptAnalysis, Optional[CodeType]]:
+        """Hash, validate and compile a script (code is None if it doesn't compile)"""
+        script_hash = hashlib.blake2b(script.encode(), digest_size=16).hexdigest()
+        script_analysis = self.validator.validate(script)
+
+        # Repeat scripts reuse their cached code object
+        code = self._code_cache.get(script_hash)
+        if code is None:
+            try:
+                code = compile(script, f"<script:{script_hash[:16]}>", "exec")
+            except (SyntaxError, ValueError):
+                # Left to fail at execution time, as before
+                code = None
+
+        return script_hash, script_analysis, code
+
+    def _cache_code(self, script_hash: str, code: CodeType):
+        """Store a compiled script in the LRU cache (event loop only)"""
+        self._code_cache[script_hash] = code
+        self._code_cache.move_to_end(script_hash)
+        while len(self._code_cache) > SCRIPT_CODE_CACHE_SIZE:
+            self._code_cache.popitem(last=False)
+
     async def _worker(self, worker_id: str):
         """Worker task that processes queue items"""
         logger.info("Worker started", worker_id=worker_id)
 
         while self._running:
             try:
-                # Get next item from queue
-                queue_item = await asyncio.wait_for(
-                    self.execution_queue.get(), timeout=1.0
-                )
+                # Block until an item is queued; shutdown cancels idle workers
+                queue_item = await self.execution_queue.get()
+                if queue_item.recorded_running:
+                    self._reserved_slots -= 1
 
                 execution_logger.log_queue_event(
                     "item_processing",
@@ -393,8 +496,6 @@ class PlaywrightExecutor:
                     self.active_executions.pop(queue_item.request_id, None)
                     self.execution_queue.task_done()
 
-            except asyncio.TimeoutError:
-                continue
             except Exception as e:
                 logger.error("Worker error", worker_id=worker_id, error=str(e))
 
@@ -408,17 +509,16 @@ class PlaywrightExecutor:
         execution_logger.log_execution_start(
             request_id=request_id,
             api_key_id=queue_item.api_key_id,
-            script_hash=hashlib.sha256(queue_item.script.encode()).hexdigest(),
+            script_hash=queue_item.script_hash,
             queue_position=queue_item.position,
             priority=queue_item.priority,
             tags=queue_item.tags,
         )
 
-        # Update status to running
+        # Update status to running (queue_wait_time is also written on completion)
         queue_wait_time = start_time - queue_item.created_at
-        await update_execution_status(
-            request_id, ExecutionStatus.RUNNING, queue_wait_time=queue_wait_time
-        )
+        if not queue_item.recorded_running:
+            await mark_running(request_id, queue_wait_time)
 
         browser = None
         context = None
@@ -430,64 +530,42 @@ class PlaywrightExecutor:
             browser = await self.browser_pool.get_browser()
 
             # Create context with video recording
-            context_options = {
-                "viewport": {
-                    "width": settings.VIDEO_WIDTH,
-                    "height": settings.VIDEO_HEIGHT,
-                },
-                "record_video_dir": "./data/videos",
-                "record_video_size": {
-                    "width": settings.VIDEO_WIDTH,
-                    "height": settings.VIDEO_HEIGHT,
-                },
-            }
-
+            context_options = self._context_options
             if queue_item.user_agent:
-                context_options["user_agent"] = queue_item.user_agent
+                context_options = {**context_options, "user_agent": queue_item.user_agent}
 
             context = await browser.new_context(**context_options)
             page = await context.new_page()
 
             # Monitor resource usage
-            process = psutil.Process()
-            initial_memory = process.memory_info().rss / 1024 / 1024  # MB
-            initial_cpu_time = process.cpu_times().user + process.cpu_times().system
+            cpu_times = self._process.cpu_times()
+            initial_cpu_time = cpu_times.user + cpu_times.system
 
             # Execute script with timeout
             result = await asyncio.wait_for(
-                self._run_script(page, queue_item.script), timeout=queue_item.timeout
+                self._run_script(page, queue_item.script, queue_item.code),
+                timeout=queue_item.timeout,
             )
 
-            # Calculate resource usage
-            final_memory = process.memory_info().rss / 1024 / 1024
-            final_cpu_time = process.cpu_times().user + process.cpu_times().system
-            memory_peak_mb = max(initial_memory, final_memory)
-            cpu_time_ms = int((final_cpu_time - initial_cpu_time) * 1000)
+            # Calculate resource usage (memory is process-wide, so only the
+            # end-of-run sample is kept)
+            with self._process.oneshot():
+                memory_peak_mb = self._process.memory_info().rss / 1024 / 1024  # MB
+                cpu_times = self._process.cpu_times()
+            cpu_time_ms = int((cpu_times.user + cpu_times.system - initial_cpu_time) * 1000)
 
             execution_time = time.time() - start_time
 
             # Close context to save video and get path
             if page.video:
-                video_path = await page.video.path()
-                # Rename video to use request_id
-                if video_path and os.path.exists(video_path):
-                    import shutil
-
-                    new_video_path = f"./data/videos/{request_id}.webm"
-                    shutil.move(video_path, new_video_path)
-                    video_path = new_video_path
+                video_path = await asyncio.to_thread(
+                    self._move_video, await page.video.path(), request_id
+                )
             else:
                 video_path = None
 
             video_size_mb = await self._get_video_size(video_path) if video_path else 0
 
-            # Get browser info
-            browser_info = BrowserInfo(
-                version=browser.version,
-                user_agent=await page.evaluate("navigator.userAgent"),
-                viewport=f"{settings.VIDEO_WIDTH}x{settings.VIDEO_HEIGHT}",
-            )
-
             # Update execution status
             await update_execution_status(
                 request_id=request_id,
@@ -512,13 +590,9 @@ class PlaywrightExecutor:
             video_path = None
             if page and page.video:
                 try:
-                    video_path = await page.video.path()
-                    if video_path and os.path.exists(video_path):
-                        import shutil
-
-                        new_video_path = f"./data/videos/{request_id}.webm"
-                        shutil.move(video_path, new_video_path)
-                        video_path = new_video_path
+                    video_path = await asyncio.to_thread(
+                        self._move_video, await page.video.path(), request_id
+                    )
                 except:
                     pass
 
@@ -537,6 +611,7 @@ class PlaywrightExecutor:
                 execution_time=execution_time,
                 queue_wait_time=queue_wait_time,
                 video_path=video_path,
+                video_size_mb=await self._get_video_size(video_path) if video_path else None,
             )
 
             execution_logger.log_execution_complete(
@@ -551,13 +626,9 @@ class PlaywrightExecutor:
             video_path = None
             if page and page.video:
                 try:
-                    video_path = await page.video.path()
-                    if video_path and os.path.exists(video_path):
-                        import shutil
-
-                        new_video_path = f"./data/videos/{request_id}.webm"
-                        shutil.move(video_path, new_video_path)
-                        video_path = new_video_path
+                    video_path = await asyncio.to_thread(
+                        self._move_video, await page.video.path(), request_id
+                    )
                 except:
                     pass
 
@@ -578,6 +649,7 @@ class PlaywrightExecutor:
                 execution_time=execution_time,
                 queue_wait_time=queue_wait_time,
                 video_path=video_path,
+                video_size_mb=await self._get_video_size(video_path) if video_path else None,
             )
 
             execution_logger.log_execution_complete(
@@ -598,7 +670,7 @@ class PlaywrightExecutor:
             if browser:
                 await self.browser_pool.return_browser(browser)
 
-    async def _run_script(self, page: Page, script: str) -> Any:
+    async def _run_script(self, page: Page, script: str, code: Optional[CodeType]) -> Any:
         """Run the actual script in a secure namespace"""
         # Create secure namespace
         namespace = {
@@ -609,8 +681,8 @@ class PlaywrightExecutor:
             "time": time,
         }
 
-        # Execute script
-        exec(script, namespace)
+        # Execute script (compiled when queued; source only if that failed)
+        exec(code if code is not None else script, namespace)
 
         # Call main function if it exists
         if "main" in namespace and callable(namespace["main"]):
@@ -627,45 +699,45 @@ class PlaywrightExecutor:
         except:
             return None
 
+    def _move_video(self, video_path: Optional[str], request_id: str) -> Optional[str]:
+        """Rename a recorded video to use request_id"""
+        if not video_path:
+            return video_path
+
+        new_video_path = f"./data/videos/{request_id}.webm"
+        try:
+            # Single rename on the same filesystem; no exists()/move() probing
+            os.replace(video_path, new_video_path)
+        except FileNotFoundError:
+            return video_path
+        return new_video_path
+
     async def _get_video_size(self, video_path: str) -> float:
         """Get video file size in MB"""
         try:
-            import os
-
-            size_bytes = os.path.getsize(video_path)
+            # Stat off the event loop; the video directory may be on slow storage
+            size_bytes = await asyncio.to_thread(os.path.getsize, video_path)
             return size_bytes / 1024 / 1024
         except:
             return 0.0
 
     async def get_queue_status(self) -> Dict[str, Any]:
         """Get current queue status"""
-        queue_items = []
-        temp_items = []
-
-        # Extract all items to inspect them
-        try:
-            while not self.execution_queue.empty():
-                item = await asyncio.wait_for(
-                    self.execution_queue.get_nowait(), timeout=0.1
-                )
-                temp_items.append(item)
-                queue_items.append(
-                    {
-                        "request_id": item.request_id,
-                        "priority": item.priority,
-                        "created_at": item.created_at,
-                        "estimated_duration": item.estimated_duration,
-                        "tags": item.tags,
-                    }
-                )
-        except:
-            pass
-
-        # Put items back
-        for item in temp_items:
-            await self.execution_queue.put(item)
+        # Peek at the head of the heap instead of draining and re-queueing
+        pending = self.execution_queue.peek(10)
+        queue_items = [
+            {
+                "request_id": item.request_id,
+                "position": position,
+                "priority": item.priority,
+                "created_at": item.created_at,
+                "estimated_duration": item.estimated_duration,
+                "tags": item.tags,
+            }
+            for position, item in enumerate(pending)
+        ]
 
-        total_queued = len(queue_items)
+        total_queued = self.execution_queue.qsize()
         total_running = len(self.active_executions)
 
         # Estimate wait time (simplified)
@@ -675,7 +747,7 @@ class PlaywrightExecutor:
             "total_queued": total_queued,
             "total_running": total_running,
             "estimated_wait_time": estimated_wait_time,
-            "queue_items": queue_items[:10],  # Show first 10 items
+            "queue_items": queue_items,  # First 10 items
         }
 
     async def health_check(self) -> Dict[str, Any]:
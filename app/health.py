@@ -1,22 +1,56 @@
 import asyncio
 import psutil
 import os
+import time
 from datetime import datetime
-from typing import Dict, Any
+from typing import Dict, Any, Optional, Tuple
 import structlog
 
 from app.config import settings
 from app.models import HealthStatus, HealthResponse, HealthServices, HealthMetrics, BrowserPoolStatus
-from app.database import get_api_key_by_value
+from app.database import get_api_key_by_value, count_api_keys
 from app.video_service import video_service
 
 logger = structlog.get_logger()
 
+# Metrics and dashboard status are shared by every poller within this window
+METRICS_CACHE_SECONDS = 2
+
 class HealthChecker:
     """Comprehensive health checking system"""
 
     def __init__(self):
         self.startup_time = datetime.now()
+        # Prime the CPU counter so later non-blocking samples are meaningful
+        psutil.cpu_percent(interval=None)
+        # (monotonic bucket, value) caches for the poll-heavy endpoints
+        self._metrics_cache: Optional[Tuple[int, HealthMetrics]] = None
+        self._status_cache: Optional[Tuple[int, Dict[str, Any]]] = None
+        # One resource sample per window: cpu_percent(interval=None) measures
+        # since the previous call, so a second concurrent call would read ~0%
+        self._resources_cache: Optional[Tuple[int, float, asyncio.Task]] = None
+
+    def _cache_bucket(self) -> int:
+        """Current fixed-width cache window"""
+        return int(time.monotonic()) // METRICS_CACHE_SECONDS
+
+    def _sample_system_resources(self):
+        """Read memory and disk usage (blocking syscalls, run in a thread)"""
+        return psutil.virtual_memory(), psutil.disk_usage('./data')
+
+    async def _get_system_resources(self):
+        """Sample system resources once per cache window, shared by all callers"""
+        bucket = self._cache_bucket()
+        if self._resources_cache is None or self._resources_cache[0] != bucket:
+            # psutil tracks the CPU baseline per thread, so sample it here on
+            # the event loop thread (primed in __init__), not in the worker
+            cpu_percent = psutil.cpu_percent(interval=None)
+            task = asyncio.create_task(asyncio.to_thread(self._sample_system_resources))
+            self._resources_cache = (bucket, cpu_percent, task)
+
+        _, cpu_percent, task = self._resources_cache
+        memory, disk_usage = await asyncio.shield(task)
+        return memory, cpu_percent, disk_usage
 
     async def check_database(self) -> bool:
         """Check database connectivity"""
@@ -64,7 +98,17 @@ class HealthChecker:
             return False
 
     async def get_system_metrics(self) -> HealthMetrics:
-        """Get system metrics"""
+        """Get system metrics (cached per METRICS_CACHE_SECONDS window)"""
+        bucket = self._cache_bucket()
+        if self._metrics_cache and self._metrics_cache[0] == bucket:
+            return self._metrics_cache[1]
+
+        metrics = await self._collect_system_metrics()
+        self._metrics_cache = (bucket, metrics)
+        return metrics
+
+    async def _collect_system_metrics(self) -> HealthMetrics:
+        """Collect system metrics"""
         try:
             from app.executor import executor
 
@@ -76,22 +120,16 @@ class HealthChecker:
             # Video storage metrics
             video_stats = await video_service.get_storage_stats()
 
-            # System metrics
-            memory = psutil.virtual_memory()
-            cpu_percent = psutil.cpu_percent(interval=1)
-
-            # Disk usage for data directory
-            disk_usage = psutil.disk_usage('./data')
+            # System metrics and disk usage for data directory
+            memory, cpu_percent, disk_usage = await self._get_system_resources()
             disk_usage_gb = (disk_usage.total - disk_usage.free) / (1024 ** 3)
 
             # Uptime
             uptime_seconds = (datetime.now() - self.startup_time).total_seconds()
 
-            # API keys count (simplified)
+            # API keys count
             try:
-                from app.database import list_api_keys
-                api_keys = await list_api_keys()
-                total_api_keys = len(api_keys)
+                total_api_keys = await count_api_keys()
             except:
                 total_api_keys = 0
 
@@ -142,11 +180,23 @@ class HealthChecker:
 
     async def perform_health_check(self) -> HealthResponse:
         """Perform comprehensive health check"""
-        # Check all services
-        database_healthy = await self.check_database()
-        browser_pool_healthy = await self.check_browser_pool()
-        queue_healthy = await self.check_queue()
-        disk_space_healthy = await self.check_disk_space()
+        # Check all services and collect metrics concurrently (each
+        # check handles its own errors)
+        (
+            database_healthy,
+            browser_pool_healthy,
+            queue_healthy,
+            disk_space_healthy,
+            metrics,
+            browser_pool
+        ) = await asyncio.gather(
+            self.check_database(),
+            self.check_browser_pool(),
+            self.check_queue(),
+            self.check_disk_space(),
+            self.get_system_metrics(),
+            self.get_browser_pool_status()
+        )
 
         services = HealthServices(
             database=database_healthy,
@@ -171,10 +221,6 @@ class HealthChecker:
         else:
             status = HealthStatus.UNHEALTHY
 
-        # Get metrics
-        metrics = await self.get_system_metrics()
-        browser_pool = await self.get_browser_pool_status()
-
         return HealthResponse(
             status=status,
             timestamp=datetime.now(),
@@ -188,8 +234,9 @@ class HealthChecker:
         warnings = []
 
         try:
+            memory, cpu_percent, disk_usage = await self._get_system_resources()
+
             # Memory check
-            memory = psutil.virtual_memory()
             memory_percent = memory.percent
             if memory_percent > 90:
                 warnings.append({
@@ -200,7 +247,6 @@ class HealthChecker:
                 })
 
             # CPU check
-            cpu_percent = psutil.cpu_percent(interval=1)
             if cpu_percent > 80:
                 warnings.append({
                     "type": "cpu",
@@ -210,7 +256,6 @@ class HealthChecker:
                 })
 
             # Disk check
-            disk_usage = psutil.disk_usage('./data')
             disk_percent = (disk_usage.used / disk_usage.total) * 100
             if disk_percent > 85:
                 warnings.append({
@@ -258,27 +303,36 @@ class HealthChecker:
             "status": "critical" if len(warnings) > 3 else "warning" if warnings else "ok"
         }
 
-    async def get_detailed_status(self) -> Dict[str, Any]:
-        """Get detailed system status for dashboard"""
-        health = await self.perform_health_check()
-        resource_warnings = await self.check_resource_limits()
-
-        # Get additional stats
-        video_stats = await video_service.get_storage_stats()
-
+    async def _get_queue_status(self) -> Dict[str, Any]:
+        """Get queue status, falling back to an empty queue on error"""
         try:
             from app.executor import executor
-            queue_status = await executor.get_queue_status()
+            return await executor.get_queue_status()
         except:
-            queue_status = {"total_queued": 0, "total_running": 0, "queue_items": []}
+            return {"total_queued": 0, "total_running": 0, "queue_items": []}
 
-        return {
+    async def get_detailed_status(self) -> Dict[str, Any]:
+        """Get detailed system status for dashboard (shared across API keys)"""
+        bucket = self._cache_bucket()
+        if self._status_cache and self._status_cache[0] == bucket:
+            return self._status_cache[1]
+
+        health, resource_warnings, video_stats, queue_status = await asyncio.gather(
+            self.perform_health_check(),
+            self.check_resource_limits(),
+            video_service.get_storage_stats(),
+            self._get_queue_status(),
+        )
+
+        status = {
             "health": health.dict(),
             "resource_warnings": resource_warnings,
             "video_storage": video_stats,
             "queue_details": queue_status,
             "last_check": datetime.now().isoformat()
         }
+        self._status_cache = (bucket, status)
+        return status
 
 
 # Global health checker instance
@@ -1,5 +1,6 @@
 import sys
 import json
+import logging
 from datetime import datetime
 from typing import Any, Dict
 import structlog
@@ -236,11 +237,60 @@ class SystemLogger:
         )
 
 
+class AuthLogger:
+    """Logger for authentication and rate limiting events"""
+
+    def __init__(self):
+        self.logger = structlog.get_logger("auth")
+        # Pre-bound loggers keep static fields out of the per-call context
+        self._invalid_key = self.logger.bind(auth_event="invalid_api_key")
+        self._rate_limited = self.logger.bind(auth_event="rate_limited")
+        self._denied = self.logger.bind(auth_event="access_denied")
+
+    def _warnings_enabled(self) -> bool:
+        return self.logger.isEnabledFor(logging.WARNING)
+
+    def log_invalid_key(self, key_prefix: str):
+        """Log an unknown API key attempt"""
+        if self._warnings_enabled():
+            self._invalid_key.warning("Invalid API key attempt", key_prefix=key_prefix)
+
+    def log_inactive_key(self, key_id: int):
+        """Log use of a disabled API key"""
+        if self._warnings_enabled():
+            self._invalid_key.warning("Inactive API key used", key_id=key_id)
+
+    def log_expired_key(self, key_id: int, expires_at: datetime):
+        """Log use of an expired API key"""
+        if self._warnings_enabled():
+            self._invalid_key.warning(
+                "Expired API key used", key_id=key_id, expires_at=expires_at
+            )
+
+    def log_rate_limited(self, key_id: int, limit: int):
+        """Log a request rejected by the per-key rate limit"""
+        if self._warnings_enabled():
+            self._rate_limited.warning("Rate limit exceeded", key_id=key_id, limit=limit)
+
+    def log_insufficient_scopes(self, key_id: int, required: list, missing: list):
+        """Log a request rejected for missing scopes"""
+        if self._warnings_enabled():
+            self._denied.warning(
+                "Insufficient scopes", key_id=key_id, required=required, missing=missing
+            )
+
+    def log_admin_denied(self, key_id: int):
+        """Log a non-admin key hitting an admin endpoint"""
+        if self._warnings_enabled():
+            self._denied.warning("Admin access denied", key_id=key_id)
+
+
+# Initialize logging on import, before the loggers below are created
+setup_logging()
+
+
 # Global logger instances
 request_logger = RequestLogger()
 execution_logger = ExecutionLogger()
 system_logger = SystemLogger()
-
-
-# Initialize logging on import
-setup_logging()
+auth_logger = AuthLogger()
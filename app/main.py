@@ -1,10 +1,13 @@
 from fastapi import FastAPI, HTTPException, Depends, Request, Query, BackgroundTasks
-from fastapi.responses import FileResponse, HTMLResponse, JSONResponse
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import FileResponse, HTMLResponse, ORJSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.trustedhost import TrustedHostMiddleware
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
+from jinja2 import FileSystemBytecodeCache
 import asyncio
+import os
 from datetime import datetime
 from typing import Optional, List
 import uvicorn
@@ -33,6 +36,7 @@ from app.database import (
     update_api_key,
     delete_api_key,
     get_execution_analytics,
+    close_connection,
 )
 from app.auth import (
     get_current_api_key,
@@ -41,12 +45,20 @@ from app.auth import (
     require_videos,
     require_dashboard,
     RateLimitMiddleware,
+    clear_auth_cache,
+    get_cached_api_key,
+    start_auth_cache_sweeper,
+    stop_auth_cache_sweeper,
+    start_usage_flusher,
+    stop_usage_flusher,
+    close_redis_rate_limiter,
 )
 from app.executor import executor
 from app.video_service import video_service
 from app.health import health_checker
 from app.webhooks import webhook_service
 from app.templates import template_service
+from app.cleanup import start_cleanup_scheduler, stop_cleanup_scheduler
 from app.validation import script_validator
 from app.logger import request_logger, system_logger
 
@@ -95,6 +107,7 @@ app = FastAPI(
         "name": "MIT License",
         "url": "https://opensource.org/licenses/MIT",
     },
+    default_response_class=ORJSONResponse,
 )
 
 # Add middleware
@@ -106,12 +119,18 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-app.add_middleware(RateLimitMiddleware)
+app.add_middleware(
+    RateLimitMiddleware, bypass_paths=("/health", "/metrics", "/static/")
+)
 
 # Mount static files and templates
 try:
     app.mount("/static", StaticFiles(directory="static"), name="static")
     templates = Jinja2Templates(directory="templates")
+    # Templates don't change at runtime: cache compiled bytecode, skip mtime checks
+    os.makedirs("./data/jinja_cache", exist_ok=True)
+    templates.env.bytecode_cache = FileSystemBytecodeCache("./data/jinja_cache")
+    templates.env.auto_reload = False
 except Exception as e:
     logger.warning("Static files or templates not found", error=str(e))
     templates = None
@@ -125,6 +144,9 @@ async def startup_event():
         system_logger.log_startup("database")
         await init_database()
         await ensure_admin_key()
+        start_auth_cache_sweeper()
+        start_usage_flusher()
+        template_service.start_usage_flusher()
 
         system_logger.log_startup("executor")
         await executor.initialize()
@@ -135,10 +157,16 @@ async def startup_event():
         system_logger.log_startup("webhook_service")
         # Webhook service doesn't need initialization
 
+        # Video retention, daily stats, rollups and hourly PRAGMA optimize
+        await start_cleanup_scheduler()
+
         logger.info("Playwright Automation Server started successfully")
 
     except Exception as e:
         logger.error("Failed to start server", error=str(e))
+        # Shutdown won't run after a failed startup; aiosqlite's threads are
+        # non-daemon, so an open connection would keep the process alive
+        await close_connection()
         raise
 
 
@@ -146,6 +174,12 @@ async def startup_event():
 async def shutdown_event():
     """Graceful shutdown"""
     try:
+        await stop_auth_cache_sweeper()
+        await stop_usage_flusher()
+        await template_service.stop_usage_flusher()
+        await close_redis_rate_limiter()
+        await stop_cleanup_scheduler()
+
         system_logger.log_shutdown("executor")
         await executor.shutdown()
 
@@ -157,6 +191,10 @@ async def shutdown_event():
     except Exception as e:
         logger.error("Error during shutdown", error=str(e))
 
+    finally:
+        # Always release the database threads, or the process hangs on exit
+        await close_connection()
+
 
 # Middleware for request logging
 @app.middleware("http")
@@ -596,6 +634,7 @@ async def update_existing_api_key(
         api_key = await update_api_key(key_id, update_data)
         if not api_key:
             raise HTTPException(status_code=404, detail="API key not found")
+        clear_auth_cache()
 
         logger.info("API key updated", key_id=key_id)
         return api_key
@@ -633,6 +672,7 @@ async def delete_existing_api_key(key_id: int, admin_key=Depends(require_admin))
         success = await delete_api_key(key_id)
         if not success:
             raise HTTPException(status_code=404, detail="API key not found")
+        clear_auth_cache()
 
         logger.info("API key deleted", key_id=key_id)
         return {"message": "API key deleted successfully"}
@@ -966,10 +1006,8 @@ async def get_queue_status(api_key=Depends(get_current_api_key)):
 async def get_video(request_id: str, api_key_value: str):
     """Serve video file"""
     try:
-        # Validate API key
-        from app.database import get_api_key_by_value
-
-        api_key = await get_api_key_by_value(api_key_value)
+        # Validate API key (cached: players issue many range requests)
+        api_key = await get_cached_api_key(api_key_value)
         if not api_key or not api_key.is_active:
             raise HTTPException(status_code=401, detail="Invalid API key")
 
@@ -1072,9 +1110,7 @@ async def dashboard(
     """Web dashboard (requires API key parameter)"""
     try:
         # Validate API key
-        from app.database import get_api_key_by_value
-
-        api_key_obj = await get_api_key_by_value(api_key)
+        api_key_obj = await get_cached_api_key(api_key)
         if not api_key_obj or not api_key_obj.is_active:
             raise HTTPException(status_code=401, detail="Invalid API key")
 
@@ -1082,10 +1118,24 @@ async def dashboard(
         if "dashboard" not in api_key_obj.scopes and "admin" not in api_key_obj.scopes:
             raise HTTPException(status_code=403, detail="No dashboard access")
 
-        # Get dashboard data
-        health = await health_checker.get_detailed_status()
-        queue_status = await executor.get_queue_status()
-        video_stats = await video_service.get_storage_stats()
+        # Get dashboard data (independent fetches run concurrently)
+        health, queue_status, video_stats = await asyncio.gather(
+            health_checker.get_detailed_status(),
+            executor.get_queue_status(),
+            video_service.get_storage_stats(),
+            return_exceptions=True,
+        )
+
+        # Render with whatever succeeded rather than failing the whole page
+        if isinstance(health, Exception):
+            logger.error("Dashboard health fetch failed", error=str(health))
+            health = {}
+        if isinstance(queue_status, Exception):
+            logger.error("Dashboard queue fetch failed", error=str(queue_status))
+            queue_status = {"total_queued": 0, "total_running": 0, "queue_items": []}
+        if isinstance(video_stats, Exception):
+            logger.error("Dashboard video stats fetch failed", error=str(video_stats))
+            video_stats = {}
 
         dashboard_data = {
             "api_key": api_key_obj,
@@ -1101,7 +1151,7 @@ async def dashboard(
             )
         else:
             # Return JSON if no templates
-            return JSONResponse(dashboard_data)
+            return ORJSONResponse(jsonable_encoder(dashboard_data))
 
     except HTTPException:
         raise
@@ -1175,13 +1225,14 @@ async def test_webhook_endpoint(webhook_data: dict, admin_key=Depends(require_ad
 
 @app.exception_handler(HTTPException)
 async def http_exception_handler(request: Request, exc: HTTPException):
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=exc.status_code,
         content={
             "error": exc.detail,
             "timestamp": datetime.now().isoformat(),
             "path": str(request.url.path),
         },
+        headers=exc.headers,
     )
 
 
@@ -1195,7 +1246,7 @@ async def general_exception_handler(request: Request, exc: Exception):
         error_type=type(exc).__name__,
     )
 
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=500,
         content={
             "error": "Internal server error",
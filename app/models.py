@@ -1,4 +1,5 @@
 from datetime import datetime
+from functools import cached_property
 from typing import Optional, List, Dict, Any
 from pydantic import BaseModel, Field
 from enum import Enum
@@ -163,25 +164,6 @@ class ApiKeyUpdate(BaseModel):
     )
 
 
-class ApiKeyResponse(BaseModel):
-    id: int = Field(description="Unique key identifier", example=123)
-    name: str = Field(description="Key name", example="Production Web Scraper")
-    description: Optional[str] = Field(description="Key description")
-    key_value: Optional[str] = Field(
-        description="The actual API key (only shown on creation)",
-        example="pw_live_1234567890abcdef",
-    )
-    scopes: List[str] = Field(
-        description="Granted permissions", example=["execute", "videos"]
-    )
-    rate_limit_per_minute: int = Field(description="Rate limit", example=30)
-    is_active: bool = Field(description="Whether the key is active", example=True)
-    created_at: datetime = Field(description="Creation timestamp")
-    expires_at: Optional[datetime] = Field(description="Expiration timestamp")
-    last_used_at: Optional[datetime] = Field(description="Last usage timestamp")
-    usage_count: int = Field(description="Total number of requests", example=1547)
-
-
 class ScriptResponse(BaseModel):
     request_id: str = Field(
         description="Unique identifier for tracking execution",
@@ -293,6 +275,11 @@ class ApiKeyResponse(BaseModel):
     webhook_url: Optional[str]
     notes: Optional[str]
 
+    @cached_property
+    def scopes_set(self) -> frozenset:
+        """Scopes as a frozenset for O(1) membership checks"""
+        return frozenset(self.scopes)
+
 
 class QueueStatus(BaseModel):
     total_queued: int
@@ -1,7 +1,9 @@
+import asyncio
+from collections import defaultdict
 from typing import Dict, List, Optional
 import json
-import aiosqlite
 from app.config import settings
+from app.database import get_connection, read_pool
 from app.models import ScriptTemplate
 import structlog
 
@@ -225,6 +227,10 @@ async def main():
             }
         }
 
+        # Pending usage_count increments, flushed to the database in batches
+        self._pending_usage: Dict[str, int] = defaultdict(int)
+        self._usage_flusher: Optional[asyncio.Task] = None
+
     async def get_all_templates(self) -> List[ScriptTemplate]:
         """Get all available templates (builtin + custom)"""
         templates = []
@@ -241,24 +247,31 @@ async def main():
             templates.append(template)
 
         # Add custom templates from database
+        templates.extend(await self._load_custom_templates())
+
+        return templates
+
+    async def _load_custom_templates(self, where: str = "", params: tuple = ()) -> List[ScriptTemplate]:
+        """Load custom templates from the database, optionally filtered"""
+        templates = []
+
         try:
-            async with aiosqlite.connect(settings.DATABASE_PATH) as db:
-                async with db.execute("""
+            async with read_pool.acquire() as db:
+                async with db.execute(f"""
                     SELECT name, description, script_content, category, usage_count
                     FROM script_templates
+                    {where}
                     ORDER BY usage_count DESC, name
-                """) as cursor:
-                    rows = await cursor.fetchall()
-
-                for row in rows:
-                    template = ScriptTemplate(
-                        name=row[0],
-                        description=row[1] or "",
-                        script_content=row[2],
-                        category=row[3] or "custom",
-                        usage_count=row[4] or 0
-                    )
-                    templates.append(template)
+                """, params) as cursor:
+                    async for row in cursor:
+                        template = ScriptTemplate(
+                            name=row[0],
+                            description=row[1] or "",
+                            script_content=row[2],
+                            category=row[3] or "custom",
+                            usage_count=row[4] or 0
+                        )
+                        templates.append(template)
 
         except Exception as e:
             logger.error("Failed to load custom templates", error=str(e))
@@ -280,7 +293,7 @@ async def main():
 
         # Check custom templates in database
         try:
-            async with aiosqlite.connect(settings.DATABASE_PATH) as db:
+            async with read_pool.acquire() as db:
                 async with db.execute("""
                     SELECT name, description, script_content, category, usage_count
                     FROM script_templates
@@ -305,8 +318,11 @@ async def main():
     async def create_custom_template(self, name: str, description: str,
                                    script_content: str, category: str = "custom") -> bool:
         """Create a new custom template"""
+        if name in self.builtin_templates:
+            return False  # Cannot shadow builtin templates
+
         try:
-            async with aiosqlite.connect(settings.DATABASE_PATH) as db:
+            async with get_connection() as db:
                 await db.execute("""
                     INSERT INTO script_templates (name, description, script_content, category)
                     VALUES (?, ?, ?, ?)
@@ -321,22 +337,54 @@ async def main():
             return False
 
     async def update_template_usage(self, template_name: str):
-        """Increment usage count for a template"""
+        """Increment usage count for a template (coalesced, flushed periodically)"""
         if template_name in self.builtin_templates:
             # Builtin templates don't track usage in database
             return
 
+        self._pending_usage[template_name] += 1
+
+    async def flush_template_usage(self):
+        """Write pending template usage counts in one transaction"""
+        if not self._pending_usage:
+            return
+
+        pending = [(count, name) for name, count in self._pending_usage.items()]
+        self._pending_usage.clear()
+
         try:
-            async with aiosqlite.connect(settings.DATABASE_PATH) as db:
-                await db.execute("""
+            async with get_connection() as db:
+                await db.executemany("""
                     UPDATE script_templates
-                    SET usage_count = usage_count + 1
+                    SET usage_count = usage_count + ?
                     WHERE name = ?
-                """, (template_name,))
+                """, pending)
                 await db.commit()
 
         except Exception as e:
-            logger.error("Failed to update template usage", template_name=template_name, error=str(e))
+            logger.error("Failed to update template usage", templates=len(pending), error=str(e))
+
+    async def _usage_flusher_loop(self):
+        """Periodically flush coalesced template usage"""
+        while True:
+            await asyncio.sleep(settings.USAGE_FLUSH_INTERVAL_SECONDS)
+            await self.flush_template_usage()
+
+    def start_usage_flusher(self):
+        """Start the background template usage flusher"""
+        if self._usage_flusher is None or self._usage_flusher.done():
+            self._usage_flusher = asyncio.create_task(self._usage_flusher_loop())
+
+    async def stop_usage_flusher(self):
+        """Stop the usage flusher and write any pending usage"""
+        if self._usage_flusher:
+            self._usage_flusher.cancel()
+            try:
+                await self._usage_flusher
+            except asyncio.CancelledError:
+                pass
+            self._usage_flusher = None
+        await self.flush_template_usage()
 
     async def delete_custom_template(self, template_name: str) -> bool:
         """Delete a custom template (cannot delete builtin templates)"""
@@ -344,7 +392,7 @@ async def main():
             return False  # Cannot delete builtin templates
 
         try:
-            async with aiosqlite.connect(settings.DATABASE_PATH) as db:
+            async with get_connection() as db:
                 cursor = await db.execute("""
                     DELETE FROM script_templates WHERE name = ?
                 """, (template_name,))
@@ -366,15 +414,30 @@ async def main():
 
     async def search_templates(self, query: str) -> List[ScriptTemplate]:
         """Search templates by name, description, or content"""
-        all_templates = await self.get_all_templates()
         query_lower = query.lower()
 
         matching_templates = []
-        for template in all_templates:
-            if (query_lower in template.name.lower() or
-                query_lower in template.description.lower() or
-                query_lower in template.script_content.lower()):
-                matching_templates.append(template)
+        for name, template_data in self.builtin_templates.items():
+            if (query_lower in name.lower() or
+                query_lower in template_data["description"].lower() or
+                query_lower in template_data["script_content"].lower()):
+                matching_templates.append(ScriptTemplate(
+                    name=name,
+                    description=template_data["description"],
+                    category=template_data["category"],
+                    script_content=template_data["script_content"],
+                    usage_count=0
+                ))
+
+        # Filter custom templates in SQL; escape wildcards so the query is literal
+        escaped = query.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+        pattern = f"%{escaped}%"
+        matching_templates.extend(await self._load_custom_templates(
+            """WHERE name LIKE ? ESCAPE '\\'
+                       OR description LIKE ? ESCAPE '\\'
+                       OR script_content LIKE ? ESCAPE '\\'""",
+            (pattern, pattern, pattern)
+        ))
 
         return matching_templates
 
@@ -7,6 +7,42 @@ import structlog
 
 logger = structlog.get_logger()
 
+# Patterns used on every validation, compiled once at import
+MAIN_FUNCTION_PATTERNS = [
+    re.compile(r'def\s+main\s*\('),  # Regular main function
+    re.compile(r'async\s+def\s+main\s*\('),  # Async main function
+]
+
+INFINITE_LOOP_PATTERNS = [
+    re.compile(r'while\s+True\s*:', re.IGNORECASE),
+    re.compile(r'while\s+1\s*:', re.IGNORECASE),
+    re.compile(r'for\s+.*\s+in\s+itertools\.count\(', re.IGNORECASE),
+]
+
+PERFORMANCE_PATTERNS = [
+    (re.compile(r'time\.sleep\(\s*\d+\s*\)', re.IGNORECASE), "Using time.sleep() - consider page.wait_for_timeout()"),
+    (re.compile(r'while.*not.*selector', re.IGNORECASE), "Busy waiting for selector - use wait_for_selector()"),
+    (re.compile(r'\.screenshot\(.*full_page\s*=\s*True', re.IGNORECASE), "Full page screenshots can be slow"),
+    (re.compile(r'\.pdf\(', re.IGNORECASE), "PDF generation can be resource intensive"),
+    (re.compile(r'for.*in.*range\(\s*\d{3,}', re.IGNORECASE), "Large loops may cause timeouts"),
+]
+
+SELECTOR_OPERATIONS_RE = re.compile(r'query_selector|wait_for_selector|click|fill', re.IGNORECASE)
+
+OPERATION_TIME_FACTORS = [
+    (re.compile(r'\.goto\(', re.IGNORECASE), 2.0),  # Navigation is slow
+    (re.compile(r'\.screenshot\(', re.IGNORECASE), 1.5),  # Screenshots take time
+    (re.compile(r'\.pdf\(', re.IGNORECASE), 3.0),  # PDF generation is slow
+    (re.compile(r'wait_for_selector', re.IGNORECASE), 2.0),  # Waiting operations
+    (re.compile(r'time\.sleep', re.IGNORECASE), 1.0),  # Direct sleep
+    (re.compile(r'\.fill\(', re.IGNORECASE), 0.5),  # Form filling
+    (re.compile(r'\.click\(', re.IGNORECASE), 0.3),  # Clicking
+]
+
+FORBIDDEN_IMPORT_STRINGS = ['import os', 'import sys', 'import subprocess', '__import__']
+
+CRITICAL_WARNING_RE = re.compile(r'forbidden|dangerous|syntax error|main\(\)', re.IGNORECASE)
+
 
 class ScriptValidator:
     """Advanced script validation and security analysis"""
@@ -99,13 +135,12 @@ class ScriptValidator:
         warnings = []
 
         for pattern in self.compiled_patterns:
-            matches = pattern.findall(script)
-            if matches:
+            if pattern.search(script):
                 warnings.append(f"Dangerous pattern detected: {pattern.pattern}")
 
         # Check for forbidden strings
         script_lower = script.lower()
-        for forbidden in ['import os', 'import sys', 'import subprocess', '__import__']:
+        for forbidden in FORBIDDEN_IMPORT_STRINGS:
             if forbidden in script_lower:
                 warnings.append(f"Forbidden import pattern: {forbidden}")
 
@@ -188,32 +223,20 @@ class ScriptValidator:
             warnings.append("Using 'await' without 'async def' - this will cause errors")
 
         # Check for main function using regex to handle newlines and whitespace
-        main_function_patterns = [
-            r'def\s+main\s*\(',  # Regular main function
-            r'async\s+def\s+main\s*\(',  # Async main function
-        ]
-
-        has_main_function = any(re.search(pattern, script, re.MULTILINE | re.DOTALL)
-                               for pattern in main_function_patterns)
+        has_main_function = any(pattern.search(script) for pattern in MAIN_FUNCTION_PATTERNS)
 
         logger.info("Main function validation",
                    script_preview=script[:100],
                    has_main_function=has_main_function,
-                   patterns_tested=main_function_patterns)
+                   patterns_tested=[pattern.pattern for pattern in MAIN_FUNCTION_PATTERNS])
 
         if not has_main_function:
             warnings.append("Script must contain an async main() function")
 
         # Check for infinite loops patterns
-        infinite_patterns = [
-            r'while\s+True\s*:',
-            r'while\s+1\s*:',
-            r'for\s+.*\s+in\s+itertools\.count\(',
-        ]
-
-        for pattern in infinite_patterns:
-            if re.search(pattern, script, re.IGNORECASE):
-                warnings.append(f"Potential infinite loop detected: {pattern}")
+        for pattern in INFINITE_LOOP_PATTERNS:
+            if pattern.search(script):
+                warnings.append(f"Potential infinite loop detected: {pattern.pattern}")
 
         return warnings
 
@@ -222,20 +245,12 @@ class ScriptValidator:
         warnings = []
 
         # Check for potential performance issues
-        performance_patterns = [
-            (r'time\.sleep\(\s*\d+\s*\)', "Using time.sleep() - consider page.wait_for_timeout()"),
-            (r'while.*not.*selector', "Busy waiting for selector - use wait_for_selector()"),
-            (r'\.screenshot\(.*full_page\s*=\s*True', "Full page screenshots can be slow"),
-            (r'\.pdf\(', "PDF generation can be resource intensive"),
-            (r'for.*in.*range\(\s*\d{3,}', "Large loops may cause timeouts"),
-        ]
-
-        for pattern, message in performance_patterns:
-            if re.search(pattern, script, re.IGNORECASE):
+        for pattern, message in PERFORMANCE_PATTERNS:
+            if pattern.search(script):
                 warnings.append(f"Performance concern: {message}")
 
         # Check for excessive selectors
-        selector_count = len(re.findall(r'query_selector|wait_for_selector|click|fill', script, re.IGNORECASE))
+        selector_count = len(SELECTOR_OPERATIONS_RE.findall(script))
         if selector_count > 50:
             warnings.append(f"High number of selector operations: {selector_count}")
 
@@ -256,18 +271,8 @@ class ScriptValidator:
             base_time *= 2.0  # Syntax errors make execution unpredictable
 
         # Factor in specific operations
-        operation_factors = {
-            r'\.goto\(': 2.0,  # Navigation is slow
-            r'\.screenshot\(': 1.5,  # Screenshots take time
-            r'\.pdf\(': 3.0,  # PDF generation is slow
-            r'wait_for_selector': 2.0,  # Waiting operations
-            r'time\.sleep': 1.0,  # Direct sleep
-            r'\.fill\(': 0.5,  # Form filling
-            r'\.click\(': 0.3,  # Clicking
-        }
-
-        for pattern, factor in operation_factors.items():
-            matches = len(re.findall(pattern, script, re.IGNORECASE))
+        for pattern, factor in OPERATION_TIME_FACTORS:
+            matches = len(pattern.findall(script))
             base_time += matches * factor
 
         return min(base_time, 300.0)  # Cap at 5 minutes
@@ -280,7 +285,7 @@ class ScriptValidator:
         # Determine if script should be allowed to execute
         critical_warnings = [
             w for w in analysis.security_warnings
-            if any(keyword in w.lower() for keyword in ['forbidden', 'dangerous', 'syntax error', 'main()'])
+            if CRITICAL_WARNING_RE.search(w)
         ]
 
         return {
@@ -1,17 +1,41 @@
 import os
 import asyncio
+import heapq
+import logging
+import time
 import aiofiles
+from collections import deque
 from datetime import datetime, timedelta
 from pathlib import Path
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, Deque, List, Tuple
 import structlog
 
 from app.config import settings
 from app.models import VideoInfo
+from app.database import clear_video_paths, get_video_storage_totals
 from app.logger import execution_logger
 
 logger = structlog.get_logger()
 
+# Most recent cleanup error messages kept per run; the rest are only counted
+MAX_CLEANUP_ERRORS = 100
+
+
+def _is_skipped_dir(name: str) -> bool:
+    """Hidden and cache directories never hold recordings"""
+    return name.startswith(".") or name == "__pycache__"
+
+
+def _walk_video_files(directory: str):
+    """Recursively yield DirEntry objects for .webm files under directory"""
+    with os.scandir(directory) as it:
+        for entry in it:
+            if entry.is_dir(follow_symlinks=False):
+                if not _is_skipped_dir(entry.name):
+                    yield from _walk_video_files(entry.path)
+            elif entry.name.endswith(".webm"):
+                yield entry
+
 
 class VideoService:
     """Service for managing video recordings"""
@@ -124,81 +148,165 @@ class VideoService:
 
         return False
 
-    async def cleanup_old_videos(self, retention_days: int = None) -> Dict[str, Any]:
-        """Cleanup videos older than retention period"""
-        if retention_days is None:
-            retention_days = settings.VIDEO_RETENTION_DAYS
-
-        cutoff_date = datetime.now() - timedelta(days=retention_days)
-        deleted_count = 0
-        deleted_size_mb = 0.0
-        errors = []
+    def _delete_old_videos_in(
+        self,
+        directory: str,
+        now_ts: float,
+        cutoff_ts: float,
+        deleted: List[Tuple[str, float]],
+        errors: Deque[str],
+        log_each: bool = False,
+    ) -> Tuple[int, int]:
+        """Delete old videos under directory in one post-order pass, returning (bytes freed, error count)"""
+        deleted_bytes = 0
+        error_count = 0
+
+        with os.scandir(directory) as it:
+            entries = list(it)
+
+        for entry in entries:
+            try:
+                # Descend into legacy date-based subdirectories, then drop them if emptied
+                if entry.is_dir(follow_symlinks=False):
+                    if _is_skipped_dir(entry.name):
+                        continue
+                    sub_bytes, sub_errors = self._delete_old_videos_in(
+                        entry.path, now_ts, cutoff_ts, deleted, errors, log_each
+                    )
+                    deleted_bytes += sub_bytes
+                    error_count += sub_errors
+                    try:
+                        os.rmdir(entry.path)
+                    except OSError:
+                        pass  # Still has files
+                    continue
 
-        try:
-            # Walk through videos in flat structure
-            for video_file in self.base_video_path.glob("*.webm"):
-                if not video_file.is_file():
+                if not entry.name.endswith(".webm"):
                     continue
 
-                try:
-                    # Check file creation date
-                    file_stat = video_file.stat()
-                    file_date = datetime.fromtimestamp(file_stat.st_ctime)
+                # DirEntry caches stat, so each file costs at most one syscall
+                stat = entry.stat(follow_symlinks=False)
+                if stat.st_mtime < cutoff_ts:
+                    os.unlink(entry.path)
+                    deleted_bytes += stat.st_size
+                    deleted.append((entry.name[:-5], stat.st_mtime))
+                    if log_each:
+                        logger.debug(
+                            "Video file deleted",
+                            request_id=entry.name[:-5],
+                            path=entry.path,
+                            age_days=int((now_ts - stat.st_mtime) / 86400),
+                        )
+
+            except Exception as e:
+                errors.append(f"Failed to delete {entry.path}: {str(e)}")
+                error_count += 1
 
-                    if file_date < cutoff_date:
-                        # Delete old video
-                        file_size = file_stat.st_size / 1024 / 1024
-                        video_file.unlink()
-                        deleted_count += 1
-                        deleted_size_mb += file_size
+        return deleted_bytes, error_count
 
-                        # Remove from cache
-                        request_id = video_file.stem
-                        self.video_cache.pop(request_id, None)
+    def _delete_old_videos(
+        self, now_ts: float, cutoff_ts: float
+    ) -> Tuple[List[Tuple[str, float]], int, Deque[str], int]:
+        """Delete videos older than cutoff_ts (blocking, run in a worker thread)"""
+        deleted = []
+        deleted_bytes = 0
+        # Bounded so a failure storm can't grow memory without limit
+        errors = deque(maxlen=MAX_CLEANUP_ERRORS)
+        error_count = 0
 
-                except Exception as e:
-                    errors.append(f"Failed to delete {video_file}: {str(e)}")
+        # Per-file events are only worth their cost when debug logging is on
+        log_each = logger.isEnabledFor(logging.DEBUG)
 
+        try:
+            deleted_bytes, error_count = self._delete_old_videos_in(
+                str(self.base_video_path),
+                now_ts,
+                cutoff_ts,
+                deleted,
+                errors,
+                log_each,
+            )
         except Exception as e:
             errors.append(f"Cleanup error: {str(e)}")
+            error_count += 1
+
+        return deleted, deleted_bytes, errors, error_count
+
+    async def cleanup_old_videos(self, retention_days: int = None) -> Dict[str, Any]:
+        """Cleanup videos older than retention period"""
+        if retention_days is None:
+            retention_days = settings.VIDEO_RETENTION_DAYS
+
+        # Snapshot the clock once; file ages are plain float comparisons
+        now_ts = time.time()
+        cutoff_ts = now_ts - retention_days * 86400
+        cutoff_date = datetime.fromtimestamp(cutoff_ts)
+
+        # Keep the directory walk and unlinks off the event loop
+        deleted, deleted_bytes, errors, error_count = await asyncio.to_thread(
+            self._delete_old_videos, now_ts, cutoff_ts
+        )
+        deleted_ids = [request_id for request_id, _ in deleted]
+        deleted_count = len(deleted_ids)
+
+        # Remove from cache
+        for request_id in deleted_ids:
+            self.video_cache.pop(request_id, None)
+
+        # Clear video paths of deleted files in one batched update
+        try:
+            await clear_video_paths(deleted_ids)
+        except Exception as e:
+            errors.append(f"Failed to update execution records: {str(e)}")
+            error_count += 1
 
+        deleted_size_mb = deleted_bytes / 1024 / 1024
         result = {
             "deleted_count": deleted_count,
             "deleted_size_mb": deleted_size_mb,
             "retention_days": retention_days,
             "cutoff_date": cutoff_date.isoformat(),
-            "errors": errors,
+            "errors": list(errors),
+            "error_count": error_count,
         }
 
         if deleted_count > 0:
+            # One summary event for the whole run instead of one per file
+            mtimes = [mtime for _, mtime in deleted]
             execution_logger.log_video_event(
                 "cleanup_completed",
                 request_id="bulk",
                 deleted_count=deleted_count,
                 deleted_size_mb=deleted_size_mb,
+                oldest_age_days=int((now_ts - min(mtimes)) / 86400),
+                newest_age_days=int((now_ts - max(mtimes)) / 86400),
             )
 
         return result
 
-    async def get_storage_stats(self) -> Dict[str, Any]:
-        """Get video storage statistics"""
+    async def get_storage_stats(self, deep: bool = False) -> Dict[str, Any]:
+        """Get video storage statistics (deep=True walks the video directory)"""
         total_files = 0
         total_size_mb = 0.0
         oldest_video = None
         newest_video = None
 
         try:
-            for video_file in self.base_video_path.rglob("*.webm"):
-                if video_file.is_file():
-                    stat = video_file.stat()
-                    total_files += 1
-                    total_size_mb += stat.st_size / 1024 / 1024
-
-                    file_time = datetime.fromtimestamp(stat.st_ctime)
-                    if oldest_video is None or file_time < oldest_video:
-                        oldest_video = file_time
-                    if newest_video is None or file_time > newest_video:
-                        newest_video = file_time
+            if not deep:
+                # Sizes are recorded per execution, so no filesystem walk is needed
+                totals = await get_video_storage_totals()
+                total_files = totals["total_files"]
+                total_size_mb = totals["total_size_mb"]
+                oldest_video = totals["oldest_video"]
+                newest_video = totals["newest_video"]
+
+            else:
+                (
+                    total_files,
+                    total_size_mb,
+                    oldest_video,
+                    newest_video,
+                ) = await asyncio.to_thread(self._scan_storage_totals)
 
         except Exception as e:
             logger.error("Failed to get storage stats", error=str(e))
@@ -212,92 +320,103 @@ class VideoService:
             "retention_days": settings.VIDEO_RETENTION_DAYS,
         }
 
+    def _scan_storage_totals(
+        self,
+    ) -> Tuple[int, float, Optional[datetime], Optional[datetime]]:
+        """Walk the video directory for count, size and age range (blocking)"""
+        total_files = 0
+        total_bytes = 0
+        oldest_ts = None
+        newest_ts = None
+
+        for entry in _walk_video_files(str(self.base_video_path)):
+            stat = entry.stat(follow_symlinks=False)
+            total_files += 1
+            total_bytes += stat.st_size
+
+            if oldest_ts is None or stat.st_ctime < oldest_ts:
+                oldest_ts = stat.st_ctime
+            if newest_ts is None or stat.st_ctime > newest_ts:
+                newest_ts = stat.st_ctime
+
+        return (
+            total_files,
+            total_bytes / 1024 / 1024,
+            datetime.fromtimestamp(oldest_ts) if oldest_ts is not None else None,
+            datetime.fromtimestamp(newest_ts) if newest_ts is not None else None,
+        )
+
     async def list_videos_by_date(
         self, date: datetime, limit: int = 100
     ) -> List[Dict[str, Any]]:
         """List videos created on a specific date"""
-        videos = []
-
-        # Get date range (start and end of the day)
-        start_of_day = date.replace(hour=0, minute=0, second=0, microsecond=0)
-        end_of_day = start_of_day + timedelta(days=1)
-
-        try:
-            # Get all video files
-            all_video_files = list(self.base_video_path.glob("*.webm"))
+        return await asyncio.to_thread(self._scan_videos_by_date, date, limit)
 
-            for video_file in all_video_files:
+    def _scan_video_files(self):
+        """Yield (request_id, path, stat) for each video in the flat directory"""
+        with os.scandir(self.base_video_path) as entries:
+            for entry in entries:
+                if not entry.name.endswith(".webm"):
+                    continue
                 try:
-                    stat = video_file.stat()
-                    file_date = datetime.fromtimestamp(stat.st_ctime)
-
-                    # Check if file was created on the specified date
-                    if start_of_day <= file_date < end_of_day:
-                        request_id = video_file.stem
-
-                        videos.append(
-                            {
-                                "request_id": request_id,
-                                "file_path": str(video_file),
-                                "size_mb": round(stat.st_size / 1024 / 1024, 2),
-                                "created_at": file_date.isoformat(),
-                                "width": settings.VIDEO_WIDTH,
-                                "height": settings.VIDEO_HEIGHT,
-                            }
-                        )
-
-                except Exception as e:
+                    yield entry.name[:-5], entry.path, entry.stat()
+                except OSError as e:
                     logger.error(
                         "Failed to process video file",
-                        file=str(video_file),
+                        file=entry.path,
                         error=str(e),
                     )
 
+    def _video_entry(self, request_id: str, path: str, stat) -> Dict[str, Any]:
+        """Build the listing dict for a video file"""
+        return {
+            "request_id": request_id,
+            "file_path": path,
+            "size_mb": round(stat.st_size / 1024 / 1024, 2),
+            "created_at": datetime.fromtimestamp(stat.st_ctime).isoformat(),
+            "width": settings.VIDEO_WIDTH,
+            "height": settings.VIDEO_HEIGHT,
+        }
+
+    def _scan_videos_by_date(self, date: datetime, limit: int) -> List[Dict[str, Any]]:
+        """Scan the video directory for a date (blocking, run in a worker thread)"""
+        # Get date range (start and end of the day)
+        start_of_day = date.replace(hour=0, minute=0, second=0, microsecond=0)
+        start_ts = start_of_day.timestamp()
+        end_ts = (start_of_day + timedelta(days=1)).timestamp()
+
+        try:
+            # Keep only the newest `limit` files created on the specified date
+            newest = heapq.nlargest(
+                limit,
+                (
+                    video
+                    for video in self._scan_video_files()
+                    if start_ts <= video[2].st_ctime < end_ts
+                ),
+                key=lambda video: video[2].st_ctime,
+            )
+            return [self._video_entry(*video) for video in newest]
+
         except Exception as e:
             logger.error("Failed to list videos", date=date.isoformat(), error=str(e))
-
-        # Sort by creation time (newest first) and limit
-        videos.sort(key=lambda x: x["created_at"], reverse=True)
-        return videos[:limit]
+            return []
 
     async def get_recent_videos(self, limit: int = 50) -> List[Dict[str, Any]]:
         """Get most recent videos"""
-        all_videos = []
+        return await asyncio.to_thread(self._scan_recent_videos, limit)
 
+    def _scan_recent_videos(self, limit: int) -> List[Dict[str, Any]]:
+        """Scan the video directory for the newest files (blocking)"""
         try:
-            # Get all video files from flat structure
-            video_files = list(self.base_video_path.glob("*.webm"))
-
-            for video_file in video_files:
-                try:
-                    stat = video_file.stat()
-                    request_id = video_file.stem
-
-                    all_videos.append(
-                        {
-                            "request_id": request_id,
-                            "file_path": str(video_file),
-                            "size_mb": round(stat.st_size / 1024 / 1024, 2),
-                            "created_at": datetime.fromtimestamp(
-                                stat.st_ctime
-                            ).isoformat(),
-                            "width": settings.VIDEO_WIDTH,
-                            "height": settings.VIDEO_HEIGHT,
-                        }
-                    )
-                except Exception as e:
-                    logger.error(
-                        "Failed to process video file",
-                        file=str(video_file),
-                        error=str(e),
-                    )
+            newest = heapq.nlargest(
+                limit, self._scan_video_files(), key=lambda video: video[2].st_ctime
+            )
+            return [self._video_entry(*video) for video in newest]
 
         except Exception as e:
             logger.error("Failed to get recent videos", error=str(e))
-
-        # Sort by creation time and limit
-        all_videos.sort(key=lambda x: x["created_at"], reverse=True)
-        return all_videos[:limit]
+            return []
 
     async def validate_video_access(self, request_id: str, api_key_id: int) -> bool:
         """Validate that API key can access specific video"""
@@ -314,12 +433,12 @@ class VideoService:
 
     async def estimate_disk_usage(self) -> Dict[str, Any]:
         """Estimate disk usage and projection"""
-        stats = await self.get_storage_stats()
-
-        # Estimate daily growth (based on recent videos)
-        today_videos = await self.list_videos_by_date(datetime.now())
-        yesterday_videos = await self.list_videos_by_date(
-            datetime.now() - timedelta(days=1)
+        # Stats and both directory scans are independent, so run them together
+        now = datetime.now()
+        stats, today_videos, yesterday_videos = await asyncio.gather(
+            self.get_storage_stats(),
+            self.list_videos_by_date(now),
+            self.list_videos_by_date(now - timedelta(days=1)),
         )
 
         daily_growth_mb = 0.0
@@ -69,20 +69,7 @@ except Exception as e:
     exit(1)
 "
 
-# Start cleanup service in background
-echo "🧹 Starting cleanup service..."
-python3 -c "
-import asyncio
-from app.cleanup import start_cleanup_scheduler
-try:
-    asyncio.run(start_cleanup_scheduler())
-    print('✅ Cleanup service started')
-except Exception as e:
-    print(f'⚠️  Cleanup service warning: {e}')
-" &
-
-# Wait a moment for cleanup service to start
-sleep 2
+# The cleanup service runs inside the server process (started on app startup)
 
 echo "🚀 Starting FastAPI server..."
 echo "📊 Dashboard will be available at http://localhost:8000/dashboard?api_key=<your_key>"